@@ -24,6 +24,7 @@ setup(
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",
+            "pytest-xdist>=3.0",
             "black>=23.0",
             "pylint>=2.0",
             "mypy>=1.0",
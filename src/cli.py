@@ -1,50 +1,90 @@
-import subprocess
-import tempfile
-from datetime import datetime
+import copy
+import functools
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import click
 
-from src.graph.builder import GraphBuilder
-from src.rendering import MermaidGenerator
+from src.utils.cache_dirs import private_cache_dir
 
+# Heavier modules (subprocess, tempfile, the graph builder and generator) are
+# imported where they are used so `--help` and early error exits stay fast
 
-def _write_text(path: Path, content: str):
+
+def _write_text(path: Path, content: Union[str, bytes]):
+    # Encode once and write raw bytes, skipping the text-mode encoder layer
+    data = content.encode("utf-8") if isinstance(content, str) else content
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    with open(path, "wb", buffering=0) as f:
+        f.write(data)
 
 
-def _render_png_with_mmdc(mmd_path: Path, png_path: Path, scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
-    try:
-        cmd = ["mmdc", "-i", str(mmd_path), "-o", str(png_path)]
-        if scale is not None:
-            cmd.extend(["-s", str(scale)])
-        if width is not None:
-            cmd.extend(["-w", str(width)])
-        if height is not None:
-            cmd.extend(["-H", str(height)])
-        if background is not None:
-            cmd.extend(["-b", str(background)])
-        subprocess.run(cmd, check=True, capture_output=True)
-        return True
-    except FileNotFoundError:
-        click.echo("mmdc not found. Install Mermaid CLI: npm i -g @mermaid-js/mermaid-cli", err=True)
+# Rendered diagrams keyed by sha256 of (format, size, scale, background, code); persists across runs
+@functools.lru_cache(maxsize=None)
+def _render_cache_dir() -> Optional[Path]:
+    # A private per-user directory: files in a shared one could be planted by others
+    return private_cache_dir("render")
+
+
+def _render_cache_key(fmt: str, code: Union[str, bytes], scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> str:
+    header = f"{fmt}|{width}|{height}|{scale}|{background}|".encode("utf-8")
+    data = code.encode("utf-8") if isinstance(code, str) else code
+    return hashlib.sha256(header + data).hexdigest()
+
+
+def _load_cached_render(key: str, fmt: str, out_path: Path) -> bool:
+    """Copy a previously rendered artifact to out_path; returns False on cache miss."""
+    cache_dir = _render_cache_dir()
+    if cache_dir is None:
         return False
-    except subprocess.CalledProcessError as e:
-        click.echo(f"mmdc failed: {e.stderr.decode('utf-8', 'ignore')}", err=True)
+    cached = cache_dir / f"{key}.{fmt}"
+    if not cached.is_file():
+        return False
+    try:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, out_path)
+    except OSError:
         return False
+    return True
 
-def _render_svg_with_mmdc(mmd_path: Path, svg_path: Path, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
+
+def _store_cached_render(key: str, fmt: str, rendered_path: Path):
+    """Atomically add a rendered artifact to the cache; failures are ignored."""
+    cache_dir = _render_cache_dir()
+    if cache_dir is None:
+        return
     try:
-        cmd = ["mmdc", "-i", str(mmd_path), "-o", str(svg_path)]
-        if width is not None:
-            cmd.extend(["-w", str(width)])
-        if height is not None:
-            cmd.extend(["-H", str(height)])
-        if background is not None:
-            cmd.extend(["-b", str(background)])
-        subprocess.run(cmd, check=True, capture_output=True)
+        tmp_path = cache_dir / f"{key}.{fmt}.{os.getpid()}.tmp"
+        shutil.copyfile(rendered_path, tmp_path)
+        os.replace(tmp_path, cache_dir / f"{key}.{fmt}")
+    except OSError:
+        pass
+
+
+def _run_mmdc(source: Union[Path, str, bytes], out_path: Path, options: List[str]) -> bool:
+    """Run mmdc on a .mmd file, or on Mermaid code piped through stdin."""
+    import subprocess
+    tmp_path: Optional[Path] = None
+    stdin_data: Optional[bytes] = None
+    if isinstance(source, Path):
+        input_arg = str(source)
+    elif os.name == "posix":
+        input_arg = "/dev/stdin"
+        stdin_data = source.encode("utf-8") if isinstance(source, str) else source
+    else:
+        # No /dev/stdin on Windows: fall back to a temporary .mmd file
+        import tempfile
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=".mmd", delete=False) as tmp:
+            tmp.write(source.encode("utf-8") if isinstance(source, str) else source)
+            tmp_path = Path(tmp.name)
+        input_arg = str(tmp_path)
+    try:
+        cmd = ["mmdc", "-i", input_arg, "-o", str(out_path)] + options
+        subprocess.run(cmd, input=stdin_data, check=True, capture_output=True)
         return True
     except FileNotFoundError:
         click.echo("mmdc not found. Install Mermaid CLI: npm i -g @mermaid-js/mermaid-cli", err=True)
@@ -52,32 +92,189 @@ def _render_svg_with_mmdc(mmd_path: Path, svg_path: Path, width: Optional[int] =
     except subprocess.CalledProcessError as e:
         click.echo(f"mmdc failed: {e.stderr.decode('utf-8', 'ignore')}", err=True)
         return False
+    finally:
+        if tmp_path is not None:
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+
+def _render_png_with_mmdc(source: Union[Path, str, bytes], png_path: Path, scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
+    options: List[str] = []
+    if scale is not None:
+        options.extend(["-s", str(scale)])
+    if width is not None:
+        options.extend(["-w", str(width)])
+    if height is not None:
+        options.extend(["-H", str(height)])
+    if background is not None:
+        options.extend(["-b", str(background)])
+    return _run_mmdc(source, png_path, options)
+
+def _render_svg_with_mmdc(source: Union[Path, str, bytes], svg_path: Path, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
+    options: List[str] = []
+    if width is not None:
+        options.extend(["-w", str(width)])
+    if height is not None:
+        options.extend(["-H", str(height)])
+    if background is not None:
+        options.extend(["-b", str(background)])
+    return _run_mmdc(source, svg_path, options)
 
 def _render_png_from_code(code: str, png_path: Path, scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
-    # Write code to a temporary .mmd file and render via mmdc
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".mmd", delete=False, encoding="utf-8") as tmp:
-        tmp.write(code)
-        tmp_path = Path(tmp.name)
-    ok = _render_png_with_mmdc(tmp_path, png_path, scale=scale, width=width, height=height, background=background)
-    try:
-        tmp_path.unlink(missing_ok=True)
-    except Exception:
-        pass
+    # Encode once for both the cache key and the mmdc stdin pipe
+    data = code.encode("utf-8")
+    cache_key = _render_cache_key("png", data, scale=scale, width=width, height=height, background=background)
+    if _load_cached_render(cache_key, "png", png_path):
+        return True
+    ok = _render_png_with_mmdc(data, png_path, scale=scale, width=width, height=height, background=background)
+    if ok:
+        _store_cached_render(cache_key, "png", png_path)
     return ok
 
 def _render_svg_from_code(code: str, svg_path: Path, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
-    # Write code to a temporary .mmd file and render via mmdc
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".mmd", delete=False, encoding="utf-8") as tmp:
-        tmp.write(code)
-        tmp_path = Path(tmp.name)
-    ok = _render_svg_with_mmdc(tmp_path, svg_path, width=width, height=height, background=background)
-    try:
-        tmp_path.unlink(missing_ok=True)
-    except Exception:
-        pass
+    # Encode once for both the cache key and the mmdc stdin pipe
+    data = code.encode("utf-8")
+    cache_key = _render_cache_key("svg", data, width=width, height=height, background=background)
+    if _load_cached_render(cache_key, "svg", svg_path):
+        return True
+    ok = _render_svg_with_mmdc(data, svg_path, width=width, height=height, background=background)
+    if ok:
+        _store_cached_render(cache_key, "svg", svg_path)
     return ok
 
 
+# Per-format single-diagram renderers
+_FORMAT_RENDERERS: Dict[str, Callable[..., bool]] = {
+    "png": _render_png_from_code,
+    "svg": _render_svg_from_code,
+}
+
+
+@dataclass
+class _RenderJob:
+    """A queued PNG/SVG render for one (scheme, variant) diagram."""
+    fmt: str
+    code: str
+    out_path: Path
+    background: str
+    variant: str
+    scheme: str
+    safe_code: Callable[[], str]
+
+
+def _render_batch_with_mmdc(codes: List[str], out_paths: List[Path], fmt: str, scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None, background: Optional[str] = None) -> bool:
+    """Render several diagrams with a single mmdc invocation.
+
+    The diagrams are wrapped in one Markdown file so mmdc renders every mermaid
+    block in one browser session, writing batch-1.<fmt>, batch-2.<fmt>, ...
+    Returns False (without reporting) if any diagram is missing so the caller
+    can fall back to rendering them one by one.
+    """
+    import subprocess
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="bmf_mmdc_") as tmp_dir:
+        tmp = Path(tmp_dir)
+        md_path = tmp / "batch.md"
+        md_path.write_text("".join(f"```mermaid\n{code}```\n\n" for code in codes), encoding="utf-8")
+        cmd = ["mmdc", "-i", str(md_path), "-o", str(tmp / f"batch.{fmt}")]
+        if scale is not None:
+            cmd.extend(["-s", str(scale)])
+        if width is not None:
+            cmd.extend(["-w", str(width)])
+        if height is not None:
+            cmd.extend(["-H", str(height)])
+        if background is not None:
+            cmd.extend(["-b", str(background)])
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        except (FileNotFoundError, subprocess.CalledProcessError):
+            return False
+
+        produced = [tmp / f"batch-{idx}.{fmt}" for idx in range(1, len(codes) + 1)]
+        if not all(p.exists() for p in produced):
+            return False
+        for src, dst in zip(produced, out_paths):
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(src), str(dst))
+    return True
+
+
+def _render_job(job: _RenderJob, scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None):
+    """Render a single queued job, retrying with the sanitized diagram on failure."""
+    render = _FORMAT_RENDERERS[job.fmt]
+    options: Dict[str, Any] = {"width": width, "height": height, "background": job.background}
+    # SVG output ignores the PNG scale factor
+    if job.fmt == "png":
+        options["scale"] = scale
+
+    fmt_name = job.fmt.upper()
+    if render(job.code, job.out_path, **options):
+        click.echo(f"Rendered {job.variant} {fmt_name} ({job.scheme}) to {job.out_path}")
+    elif render(job.safe_code(), job.out_path, **options):
+        click.echo(f"Rendered {job.variant} {fmt_name} ({job.scheme}, fallback) to {job.out_path}")
+    else:
+        click.echo(f"{job.variant} {fmt_name} ({job.scheme}) rendering skipped due to mmdc error.")
+
+
+def _flush_render_group(fmt: str, background: str, group: List[_RenderJob], scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None):
+    """Render one (format, background) group of jobs with a single mmdc launch when possible."""
+    # SVG output ignores the PNG scale factor
+    job_scale = scale if fmt == "png" else None
+
+    # Serve unchanged diagrams from the render cache before launching mmdc
+    pending = []
+    for job in group:
+        cache_key = _render_cache_key(fmt, job.code, scale=job_scale, width=width, height=height, background=background)
+        if _load_cached_render(cache_key, fmt, job.out_path):
+            click.echo(f"Rendered {job.variant} {fmt.upper()} ({job.scheme}) to {job.out_path}")
+        else:
+            pending.append((job, cache_key))
+
+    if len(pending) > 1 and _render_batch_with_mmdc(
+        [job.code for job, _ in pending],
+        [job.out_path for job, _ in pending],
+        fmt,
+        scale=job_scale,
+        width=width,
+        height=height,
+        background=background,
+    ):
+        for job, cache_key in pending:
+            _store_cached_render(cache_key, fmt, job.out_path)
+            click.echo(f"Rendered {job.variant} {fmt.upper()} ({job.scheme}) to {job.out_path}")
+        return
+    for job, _ in pending:
+        _render_job(job, scale=job_scale, width=width, height=height)
+
+
+def _flush_render_jobs(jobs: List[_RenderJob], scale: Optional[float] = None, width: Optional[int] = None, height: Optional[int] = None):
+    """Render all queued jobs, sharing one mmdc launch per (format, background) group.
+
+    Each mmdc call pays the Puppeteer/Chromium startup, so diagrams with identical
+    render options are batched together, and the groups' mmdc processes run in
+    parallel. If a batch fails, its jobs are rendered individually so the
+    sanitized fallback still applies per diagram.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    groups: Dict[Tuple[str, str], List[_RenderJob]] = {}
+    for job in jobs:
+        groups.setdefault((job.fmt, job.background), []).append(job)
+    if not groups:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(8, len(groups))) as executor:
+        futures = [
+            executor.submit(_flush_render_group, fmt, bg, group, scale=scale, width=width, height=height)
+            for (fmt, bg), group in groups.items()
+        ]
+        for future in futures:
+            future.result()
+
+
 @click.command()
 @click.argument("object_path", type=click.Path(exists=True, file_okay=False))
 @click.option("--out", "out_path", type=click.Path(), default="flow.mmd", help="Output .mmd file path")
@@ -99,6 +296,12 @@ def _render_svg_from_code(code: str, svg_path: Path, width: Optional[int] = None
 @click.option("--hide-utility/--show-utility", default=True, help="Hide utility tasks like SetEnvironmentVariables for cleaner diagrams")
 def main(object_path: str, out_path: str, variant_choice: str, render_format: Optional[str], render_scale: float, png_width: Optional[int], png_height: Optional[int], png_bg: Optional[str], edge_labels: bool, scheme_choice: str, direction: Optional[str], hide_utility: bool):
     """Build the flow graph and generate a Mermaid diagram from OBJECT_PATH."""
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+
+    from src.graph.builder import GraphBuilder
+    from src.rendering import MermaidGenerator
+
     builder = GraphBuilder(object_path)
     result = builder.build()
     if not result.success:
@@ -126,81 +329,82 @@ def main(object_path: str, out_path: str, variant_choice: str, render_format: Op
     # Generate timestamp for filenames: MMDDYYYY_HHMMSS
     timestamp = datetime.now().strftime("%m%d%Y_%H%M%S")
 
-    for scheme in schemes_to_gen:
-        for var_name, show_params in variants_to_gen:
-            # Detailed mode: show utility tasks and enhanced details
-            # Overview mode: hide utility tasks for cleaner view
-            hide_util = not show_params  # detailed=False hides, detailed=True shows
-            gen = MermaidGenerator(direction=direction, color_scheme=scheme, hide_utility_tasks=hide_util)
-            code = gen.generate(result.graph, title=f"{obj_name} ({var_name})", label_edges=edge_labels, show_params=show_params)
-
-            # Generate filename: {object_name}_{timestamp}_flow_architecture_{scheme}_{variant}
-            filename = f"{obj_name}_{timestamp}_flow_architecture_{scheme}_{var_name}.mmd"
-            out_dir = Path(out_path).parent if Path(out_path).parent.name else Path(".")
-            mmd_path = out_dir / filename
-            _write_text(mmd_path, code)
-            click.echo(f"Wrote {var_name} Mermaid ({scheme}) to {mmd_path}")
+    # Resolve render formats once; renders are queued and flushed after all variants are written
+    render_formats = []
+    if render_format in ("png", "both"):
+        render_formats.append("png")
+    if render_format in ("svg", "both"):
+        render_formats.append("svg")
+    render_jobs: List[_RenderJob] = []
+    base_gen = MermaidGenerator(direction=direction)
+
+    # Loop-invariant output location and filename prefix:
+    # {object_name}_{timestamp}_flow_architecture_{scheme}_{variant}.mmd
+    out_parent = Path(out_path).parent
+    out_dir = out_parent if out_parent.name else Path(".")
+    filename_prefix = f"{obj_name}_{timestamp}_flow_architecture_"
 
-            # Render PNG and/or SVG if requested
-            if render_format:
-                # Determine background default by scheme if not provided
-                bg = png_bg
-                if bg is None:
-                    bg = "#1e1e1e" if scheme.lower() == "dark" else "#ffffff"
-                
-                render_png = render_format in ("png", "both")
-                render_svg = render_format in ("svg", "both")
-
-                if render_png:
-                    code_png = gen.generate(
-                        result.graph,
-                        title=f"{obj_name} ({var_name})",
-                        label_edges=edge_labels,
-                        show_params=show_params,
-                        png_safe=False,
-                    )
-                    png_path = mmd_path.with_suffix(".png")
-                    if _render_png_from_code(code_png, png_path, scale=render_scale if (png_width is None and png_height is None) else None, width=png_width, height=png_height, background=bg):
-                        click.echo(f"Rendered {var_name} PNG ({scheme}) to {png_path}")
-                    else:
-                        # Fallback: try sanitized version
-                        code_png_safe = gen.generate(
-                            result.graph,
-                            title=f"{obj_name} ({var_name})",
-                            label_edges=edge_labels,
-                            show_params=show_params,
-                            png_safe=True,
-                        )
-                        if _render_png_from_code(code_png_safe, png_path, scale=render_scale if (png_width is None and png_height is None) else None, width=png_width, height=png_height, background=bg):
-                            click.echo(f"Rendered {var_name} PNG ({scheme}, fallback) to {png_path}")
-                        else:
-                            click.echo(f"{var_name} PNG ({scheme}) rendering skipped due to mmdc error.")
-                
-                if render_svg:
-                    code_svg = gen.generate(
-                        result.graph,
-                        title=f"{obj_name} ({var_name})",
-                        label_edges=edge_labels,
-                        show_params=show_params,
-                        png_safe=False,
-                    )
-                    svg_path = mmd_path.with_suffix(".svg")
-                    if _render_svg_from_code(code_svg, svg_path, width=png_width, height=png_height, background=bg):
-                        click.echo(f"Rendered {var_name} SVG ({scheme}) to {svg_path}")
-                    else:
-                        # Fallback: try sanitized version
-                        code_svg_safe = gen.generate(
-                            result.graph,
-                            title=f"{obj_name} ({var_name})",
-                            label_edges=edge_labels,
-                            show_params=show_params,
-                            png_safe=True,
-                        )
-                        if _render_svg_from_code(code_svg_safe, svg_path, width=png_width, height=png_height, background=bg):
-                            click.echo(f"Rendered {var_name} SVG ({scheme}, fallback) to {svg_path}")
-                        else:
-                            click.echo(f"{var_name} SVG ({scheme}) rendering skipped due to mmdc error.")
+    def _generate_variant(item: Tuple[str, str, bool]) -> Tuple[Path, List[_RenderJob]]:
+        """Generate and write one (scheme, variant) diagram, returning its queued renders."""
+        scheme, var_name, show_params = item
+        # Detailed mode: show utility tasks and enhanced details
+        # Overview mode: hide utility tasks for cleaner view
+        hide_util = not show_params  # detailed=False hides, detailed=True shows
+        # Shallow copy of the shared generator: skips __init__, and keeps this variant's
+        # settings stable for the deferred png_safe fallback while other threads run
+        gen = copy.copy(base_gen).set_scheme(scheme).set_hide_utility(hide_util)
+        title = f"{obj_name} ({var_name})"
+        code = gen.generate(result.graph, title=title, label_edges=edge_labels, show_params=show_params)
+
+        mmd_path = out_dir / f"{filename_prefix}{scheme}_{var_name}.mmd"
+        _write_text(mmd_path, code)
+
+        # Queue PNG and/or SVG renders if requested
+        jobs: List[_RenderJob] = []
+        if render_formats:
+            # Determine background default by scheme if not provided
+            bg = png_bg
+            if bg is None:
+                bg = "#1e1e1e" if scheme.lower() == "dark" else "#ffffff"
+
+            # The .mmd source is already the unsanitized (png_safe=False) diagram, so
+            # every format renders it directly; the sanitized variant is only
+            # generated if a render fails, and at most once across formats
+            safe_code = functools.lru_cache(maxsize=None)(functools.partial(
+                gen.generate,
+                result.graph,
+                title=title,
+                label_edges=edge_labels,
+                show_params=show_params,
+                png_safe=True,
+            ))
+            for fmt in render_formats:
+                jobs.append(_RenderJob(
+                    fmt=fmt,
+                    code=code,
+                    out_path=mmd_path.with_suffix(f".{fmt}"),
+                    background=bg,
+                    variant=var_name,
+                    scheme=scheme,
+                    safe_code=safe_code,
+                ))
+        return mmd_path, jobs
+
+    # Variants share no mutable state, so they are generated concurrently;
+    # results are reported in submission order to keep the output stable
+    work_items = [
+        (scheme, var_name, show_params)
+        for scheme in schemes_to_gen
+        for var_name, show_params in variants_to_gen
+    ]
+    with ThreadPoolExecutor(max_workers=min(8, len(work_items))) as executor:
+        for (scheme, var_name, _), (mmd_path, jobs) in zip(work_items, executor.map(_generate_variant, work_items)):
+            click.echo(f"Wrote {var_name} Mermaid ({scheme}) to {mmd_path}")
+            render_jobs.extend(jobs)
 
+    if render_jobs:
+        scale = render_scale if (png_width is None and png_height is None) else None
+        _flush_render_jobs(render_jobs, scale=scale, width=png_width, height=png_height)
 
 if __name__ == "__main__":
     main()
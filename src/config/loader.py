@@ -1,28 +1,254 @@
 """BMF Flow Visualizer - Configuration Loader"""
 
-import yaml
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, Mapping, Optional, Tuple
 
+from src.utils.cache_dirs import private_cache_dir
+
+# Resolve config directory from project root once at import
+# __file__ is src/config/loader.py
+# We want to go up 3 levels to project root, then into config/
+_CONFIG_DIR = Path(__file__).resolve().parent.parent.parent / "config"
+
+# Shape used when a task definition doesn't specify one
+_CATEGORY_SHAPES = {
+    "input": "circle",
+    "output": "rounded",
+    "processing": "rect",
+    "utility": "rect",
+}
+_FALLBACK_COLOR = "#F5F5F5"
+
+
+# ============================================================================
+# Cached module-level accessors
+# ============================================================================
+
+# Parsed configs, frozen all the way down; reads are lock-free, population is locked
+_config_cache: Dict[str, Mapping[str, Any]] = {}
+_config_lock = threading.Lock()
+
+
+def load_config(config_name: str) -> Mapping[str, Any]:
+    """
+    Load configuration file.
+    
+    Args:
+        config_name: Name of config file (without .yaml)
+        
+    Returns:
+        Read-only configuration mapping (nested mappings read-only, lists as tuples)
+    """
+    cached = _config_cache.get(config_name)
+    if cached is not None:
+        return cached
+    with _config_lock:
+        # Another thread may have populated it while we waited
+        cached = _config_cache.get(config_name)
+        if cached is None:
+            cached = _freeze(_read_config_file(config_name) or {})
+            _config_cache[config_name] = cached
+        return cached
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _read_config_file(config_name: str) -> Any:
+    """Parse config/<name>.yaml, preferring a JSON copy cached for the same content."""
+    config_path = _CONFIG_DIR / f"{config_name}.yaml"
+    
+    try:
+        with open(config_path, 'rb') as f:
+            source = f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    
+    # The sidecar is keyed on the YAML content, so copies that keep an older
+    # mtime (cp -p, rsync, tar) can't pick up a stale one
+    json_path = _sidecar_path(config_name, source)
+    if json_path is not None:
+        try:
+            with open(json_path, 'rb') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    
+    # yaml is only imported when the JSON sidecar can't be used
+    import yaml
+    try:
+        from yaml import CSafeLoader as _YAMLLoader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader as _YAMLLoader
+    config = yaml.load(source, Loader=_YAMLLoader)
+    if json_path is not None:
+        _write_json_sidecar(json_path, config)
+    return config
+
+
+def _sidecar_path(config_name: str, source: bytes) -> Optional[Path]:
+    """JSON sidecar for this YAML content in the user cache, or None if there is no usable cache."""
+    cache_dir = private_cache_dir("config")
+    if cache_dir is None:
+        return None
+    return cache_dir / f"{config_name}-{hashlib.sha256(source).hexdigest()}.json"
+
+
+def _write_json_sidecar(json_path: Path, config: Any):
+    """Atomically cache a parsed config as JSON; failures (e.g. a read-only cache) are ignored."""
+    tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.tmp")
+    try:
+        data = json.dumps(config)
+        # YAML values without a lossless JSON form (non-string keys, dates) aren't cached
+        if json.loads(data) != config:
+            return
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, json_path)
+    except (OSError, TypeError, ValueError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+@lru_cache(maxsize=None)
+def _task_lookups() -> Tuple[Dict[str, str], Dict[str, str], Dict[Tuple[str, str], str], Dict[str, str]]:
+    """Precompute per-type category/shape and per-(type, scheme) color tables."""
+    config = load_config("task_definitions")
+    definitions = config.get("task_definitions") or {}
+    schemes = dict(config.get("color_schemes") or {})
+    schemes.setdefault("default", {})
+    
+    categories: Dict[str, str] = {}
+    shapes: Dict[str, str] = {}
+    colors: Dict[Tuple[str, str], str] = {}
+    for task_type, task_def in definitions.items():
+        task_def = task_def or {}
+        category = task_def.get("category", "unknown")
+        categories[task_type] = category
+        shapes[task_type] = task_def.get("shape") or _CATEGORY_SHAPES.get(category, "rect")
+        for scheme, scheme_colors in schemes.items():
+            if "color" in task_def:
+                colors[(task_type, scheme)] = task_def["color"]
+            else:
+                colors[(task_type, scheme)] = (scheme_colors or {}).get(category, _FALLBACK_COLOR)
+    
+    # Unknown task types fall back to the "unknown" category color of the scheme
+    fallback = {
+        scheme: (scheme_colors or {}).get("unknown", _FALLBACK_COLOR)
+        for scheme, scheme_colors in schemes.items()
+    }
+    return categories, shapes, colors, fallback
+
+
+@lru_cache(maxsize=None)
+def get_task_definitions() -> Mapping[str, Any]:
+    """Get task type definitions."""
+    return load_config("task_definitions").get("task_definitions", {})
+
+
+@lru_cache(maxsize=None)
+def get_task_types() -> FrozenSet[str]:
+    """Get the names of all defined task types."""
+    return frozenset(get_task_definitions())
+
+
+def get_task_def(task_type: str) -> Optional[Mapping[str, Any]]:
+    """Get definition for specific task type."""
+    return get_task_definitions().get(task_type)
+
+
+@lru_cache(maxsize=None)
+def get_color_schemes() -> Mapping[str, Mapping[str, str]]:
+    """Get color schemes."""
+    return load_config("task_definitions").get("color_schemes", {})
+
+
+def get_color_scheme(scheme: str = "default") -> Mapping[str, str]:
+    """Get specific color scheme."""
+    schemes = get_color_schemes()
+    return schemes.get(scheme, schemes.get("default", {}))
+
+
+@lru_cache(maxsize=None)
+def get_default_styling() -> Mapping[str, Any]:
+    """Get default styling options."""
+    return load_config("task_definitions").get("default_styling", {})
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize frozen mappings as objects and anything else JSON lacks as a string."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+@lru_cache(maxsize=None)
+def config_digest(config_name: str) -> str:
+    """Stable hash of a loaded config, for keying caches of results derived from it."""
+    data = json.dumps(load_config(config_name), sort_keys=True, default=_json_default)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_task_category(task_type: str) -> str:
+    """Get category for task type."""
+    return _task_lookups()[0].get(task_type, "unknown")
+
+
+@lru_cache(maxsize=None)
+def get_task_color(task_type: str, scheme: str = "default") -> str:
+    """Get color for task type."""
+    _, _, colors, fallback = _task_lookups()
+    # Unknown schemes resolve like get_color_scheme: fall back to "default"
+    if scheme not in fallback:
+        scheme = "default"
+    color = colors.get((task_type, scheme))
+    if color is None:
+        return fallback[scheme]
+    return color
+
+
+@lru_cache(maxsize=None)
+def get_task_display_name(task_type: str) -> Any:
+    """Get the display name for a task type (the type itself if none is configured)."""
+    return (get_task_def(task_type) or {}).get("display_name", task_type)
+
+
+@lru_cache(maxsize=None)
+def get_task_shape(task_type: str) -> str:
+    """Get shape for task type, with sensible fallbacks."""
+    return _task_lookups()[1].get(task_type, "rect")
+
+
+# ============================================================================
+# Backward-compatible class interface
+# ============================================================================
 
 class ConfigLoader:
-    """Load and manage configuration files."""
+    """Load and manage configuration files (forwards to the module-level cached accessors)."""
     
     _instance = None
-    _config_cache: Dict[str, Any] = {}
+    config_dir = _CONFIG_DIR
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self):
-        # Resolve config directory from project root
-        # __file__ is src/config/loader.py
-        # We want to go up 3 levels to project root, then into config/
-        project_root = Path(__file__).parent.parent.parent
-        self.config_dir = project_root / "config"
-    
     @classmethod
     def get_instance(cls):
         """Get singleton instance."""
@@ -30,84 +256,14 @@ class ConfigLoader:
             cls._instance = cls()
         return cls._instance
     
-    def load_config(self, config_name: str) -> Dict[str, Any]:
-        """
-        Load configuration file.
-        
-        Args:
-            config_name: Name of config file (without .yaml)
-            
-        Returns:
-            Configuration dictionary
-        """
-        if config_name in self._config_cache:
-            return self._config_cache[config_name]
-        
-        config_path = self.config_dir / f"{config_name}.yaml"
-        
-        if not config_path.exists():
-            raise FileNotFoundError(f"Configuration file not found: {config_path}")
-        
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        self._config_cache[config_name] = config
-        return config
-    
-    def get_task_definitions(self) -> Dict[str, Any]:
-        """Get task type definitions."""
-        config = self.load_config("task_definitions")
-        return config.get("task_definitions", {})
-    
-    def get_task_def(self, task_type: str) -> Optional[Dict[str, Any]]:
-        """Get definition for specific task type."""
-        definitions = self.get_task_definitions()
-        return definitions.get(task_type)
-    
-    def get_color_schemes(self) -> Dict[str, Dict[str, str]]:
-        """Get color schemes."""
-        config = self.load_config("task_definitions")
-        return config.get("color_schemes", {})
-    
-    def get_color_scheme(self, scheme: str = "default") -> Dict[str, str]:
-        """Get specific color scheme."""
-        schemes = self.get_color_schemes()
-        return schemes.get(scheme, schemes.get("default", {}))
-    
-    def get_default_styling(self) -> Dict[str, Any]:
-        """Get default styling options."""
-        config = self.load_config("task_definitions")
-        return config.get("default_styling", {})
-    
-    def get_task_category(self, task_type: str) -> str:
-        """Get category for task type."""
-        task_def = self.get_task_def(task_type)
-        if task_def:
-            return task_def.get("category", "unknown")
-        return "unknown"
-    
-    def get_task_color(self, task_type: str, scheme: str = "default") -> str:
-        """Get color for task type."""
-        task_def = self.get_task_def(task_type)
-        if task_def and "color" in task_def:
-            return task_def["color"]
-        
-        # Fallback to category color
-        category = self.get_task_category(task_type)
-        color_scheme = self.get_color_scheme(scheme)
-        return color_scheme.get(category, "#F5F5F5")
-
-    def get_task_shape(self, task_type: str) -> str:
-        """Get shape for task type, with sensible fallbacks."""
-        task_def = self.get_task_def(task_type)
-        if task_def and "shape" in task_def:
-            return task_def["shape"]
-        # Category-based defaults
-        cat = self.get_task_category(task_type)
-        cat_map = {
-            "input": "circle",
-            "output": "rounded",
-            "processing": "rect",
-            "utility": "rect",
-        }
-        return cat_map.get(cat, "rect")
+    load_config = staticmethod(load_config)
+    get_task_definitions = staticmethod(get_task_definitions)
+    get_task_types = staticmethod(get_task_types)
+    get_task_def = staticmethod(get_task_def)
+    get_color_schemes = staticmethod(get_color_schemes)
+    get_color_scheme = staticmethod(get_color_scheme)
+    get_default_styling = staticmethod(get_default_styling)
+    get_task_category = staticmethod(get_task_category)
+    get_task_color = staticmethod(get_task_color)
+    get_task_shape = staticmethod(get_task_shape)
+    get_task_display_name = staticmethod(get_task_display_name)
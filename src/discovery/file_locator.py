@@ -1,8 +1,22 @@
 """BMF Flow Visualizer - File Discovery and Validation"""
 
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple, Union
 import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Extracts the path from a YAML reference in one pass: surrounding quotes and an
+# optional full_path("...") wrapper are skipped
+_REF_RE = re.compile(
+    r"""^['"]*(?:(?P<full_path>full_path\()['"]*)?(?P<path>.*?)['"]*(?(full_path)\)?['"]*)$""",
+    re.DOTALL,
+)
+
+# Directories searched for YAML files, in result order
+_YAML_CATEGORIES = ("filter", "mapping", "merging_rules")
 
 
 class FileLocator:
@@ -20,14 +34,126 @@ class FileLocator:
             object_path: Path to BMF object directory
         """
         self.object_path = Path(object_path)
+        # Internals work on plain strings and os.path; Path is only used for
+        # the public attribute and return values
+        self._obj_str = str(self.object_path)
+        self._object_name = self.object_path.name
+        self._cat_dirs = {
+            category: os.path.join(self._obj_str, category)
+            for category in _YAML_CATEGORIES + ("flows",)
+        }
+        self._creation_flow_str = os.path.join(self._cat_dirs["flows"], self.MAIN_FLOW_FILE)
+        self._creation_flow_path = Path(self._creation_flow_str)
+        # stat results of existing paths; missing ones are re-checked on every
+        # lookup, since a file may be created while the locator is alive
+        self._stat_cache: Dict[str, os.stat_result] = {}
+        # Directory listings keyed by name -> (directory mtime fingerprint, result)
+        self._listing_cache: Dict[str, tuple] = {}
         self._validate_path()
     
+    def _cached_stat(self, path: Union[str, Path]) -> Optional[os.stat_result]:
+        """Return os.stat(path), or None if it doesn't exist, stat'ing an existing path only once."""
+        key = str(path)
+        try:
+            return self._stat_cache[key]
+        except KeyError:
+            pass
+        try:
+            result = os.stat(key)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        self._stat_cache[key] = result
+        return result
+    
+    def _is_dir(self, path: Union[str, Path]) -> bool:
+        st = self._cached_stat(path)
+        return st is not None and stat.S_ISDIR(st.st_mode)
+    
+    def _is_file(self, path: Union[str, Path]) -> bool:
+        st = self._cached_stat(path)
+        return st is not None and stat.S_ISREG(st.st_mode)
+    
+    @staticmethod
+    def _mtime_fingerprint(paths: List[str]) -> tuple:
+        """mtime_ns of each directory (None if missing); any entry added/removed/renamed changes it."""
+        fingerprint: List[Optional[int]] = []
+        for path in paths:
+            try:
+                fingerprint.append(os.stat(path).st_mtime_ns)
+            except (FileNotFoundError, NotADirectoryError):
+                fingerprint.append(None)
+        return tuple(fingerprint)
+    
+    @staticmethod
+    def _scan_yaml_dir(dir_path: str) -> List[str]:
+        """List the .yml files of one directory; DirEntry.is_file() uses the cached d_type."""
+        try:
+            with os.scandir(dir_path) as it:
+                return [
+                    entry.path for entry in it
+                    if entry.name.endswith(".yml") and entry.is_file()
+                ]
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+    
+    @staticmethod
+    def _count_suffixes(dir_path: str) -> Tuple[int, int]:
+        """Count .yml and .py entries of one directory in a single readdir (0, 0 if unreadable)."""
+        yaml_count = py_count = 0
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    # Split off the suffix once instead of testing each candidate
+                    _, dot, suffix = entry.name.rpartition(".")
+                    if not dot:
+                        continue
+                    if suffix == "yml":
+                        yaml_count += 1
+                    elif suffix == "py":
+                        py_count += 1
+        except OSError:
+            # Unreadable or removed since the parent was listed
+            return 0, 0
+        return yaml_count, py_count
+    
+    def _snapshot(self) -> Tuple[Dict[str, bool], Dict[str, Tuple[int, int]]]:
+        """
+        Scan the object directory once, plus each of its subdirectories once.
+        
+        Shared by top_level_entries and get_structure_summary, and reused
+        until the object directory or one of its subdirectories changes.
+        
+        Returns:
+            ({entry name: is directory}, {subdirectory name: (yml count, py count)})
+        """
+        cached = self._listing_cache.get("snapshot")
+        if cached is not None:
+            fingerprint, snapshot = cached
+            subdirs = [os.path.join(self._obj_str, name) for name in snapshot[1]]
+            if fingerprint == self._mtime_fingerprint([self._obj_str] + subdirs):
+                return snapshot
+        
+        top_level: Dict[str, bool] = {}
+        counts: Dict[str, Tuple[int, int]] = {}
+        with os.scandir(self._obj_str) as it:
+            for item in it:
+                is_dir = item.is_dir()
+                top_level[item.name] = is_dir
+                if is_dir:
+                    counts[item.name] = self._count_suffixes(item.path)
+        
+        snapshot = (top_level, counts)
+        subdirs = [os.path.join(self._obj_str, name) for name in counts]
+        self._listing_cache["snapshot"] = (self._mtime_fingerprint([self._obj_str] + subdirs), snapshot)
+        return snapshot
+    
     def _validate_path(self):
         """Validate that object path exists and is a directory."""
-        if not self.object_path.exists():
+        st = self._cached_stat(self._obj_str)
+        if st is None:
             raise FileNotFoundError(f"Object path does not exist: {self.object_path}")
         
-        if not self.object_path.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             raise NotADirectoryError(f"Object path is not a directory: {self.object_path}")
     
     def locate_creation_flow(self) -> Path:
@@ -40,14 +166,12 @@ class FileLocator:
         Raises:
             FileNotFoundError: If creation_flow.py not found
         """
-        flow_path = self.object_path / "flows" / self.MAIN_FLOW_FILE
-        
-        if not flow_path.exists():
+        if self._cached_stat(self._creation_flow_str) is None:
             raise FileNotFoundError(
-                f"creation_flow.py not found in {self.object_path / 'flows'}"
+                f"creation_flow.py not found in {self._cat_dirs['flows']}"
             )
         
-        return flow_path
+        return self._creation_flow_path
     
     def locate_yaml_file(self, yaml_reference: str) -> Optional[Path]:
         """
@@ -68,30 +192,43 @@ class FileLocator:
         if not yaml_reference:
             return None
         
-        # Clean up the reference
-        ref = yaml_reference.strip('"\'')
-        
-        # Handle full_path() calls
-        if ref.startswith("full_path("):
-            ref = ref.replace("full_path(", "").replace(")", "").strip('"\'')
+        # Clean up the reference, unwrapping full_path() calls, and remove
+        # leading slashes for relative path handling
+        m = _REF_RE.fullmatch(yaml_reference)
+        assert m is not None  # every part of the pattern is optional
+        ref = m.group("path").lstrip("/")
         
-        # Remove leading slashes for relative path handling
-        ref = ref.lstrip("/")
-        
-        # Try to find the file in common locations
-        potential_paths = [
-            self.object_path / ref,
-            self.object_path / "filter" / Path(ref).name,
-            self.object_path / "mapping" / Path(ref).name,
-            self.object_path / "merging_rules" / Path(ref).name,
-        ]
+        # Try to find the file in common locations (plain strings; Path only on return)
+        basename = ref.rstrip("/").rsplit("/", 1)[-1]
+        potential_paths = (
+            os.path.join(self._obj_str, ref),
+            os.path.join(self._cat_dirs["filter"], basename),
+            os.path.join(self._cat_dirs["mapping"], basename),
+            os.path.join(self._cat_dirs["merging_rules"], basename),
+        )
         
         for path in potential_paths:
-            if path.exists() and path.is_file():
-                return path
+            if self._is_file(path):
+                return Path(path)
         
         return None
     
+    def _yaml_listing(self) -> Dict[str, List[str]]:
+        """YAML file paths (as strings) per category, cached until a category directory changes."""
+        category_dirs = [self._cat_dirs[c] for c in _YAML_CATEGORIES]
+        fingerprint = self._mtime_fingerprint(category_dirs)
+        cached = self._listing_cache.get("yaml")
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        
+        # The category directories are independent, so their readdirs overlap
+        # (scandir releases the GIL) - this matters on cold caches and network FS
+        with ThreadPoolExecutor(max_workers=len(_YAML_CATEGORIES)) as executor:
+            yaml_files = dict(zip(_YAML_CATEGORIES, executor.map(self._scan_yaml_dir, category_dirs)))
+        
+        self._listing_cache["yaml"] = (fingerprint, yaml_files)
+        return yaml_files
+    
     def find_all_yaml_files(self) -> Dict[str, List[Path]]:
         """
         Find all YAML files in the object.
@@ -99,18 +236,16 @@ class FileLocator:
         Returns:
             Dictionary with categories as keys and lists of paths as values
         """
-        yaml_files = {
-            "filter": [],
-            "mapping": [],
-            "merging_rules": [],
-        }
-        
-        for category in yaml_files.keys():
-            category_path = self.object_path / category
-            if category_path.exists():
-                yaml_files[category] = list(category_path.glob("*.yml"))
+        return {category: list(map(Path, paths)) for category, paths in self._yaml_listing().items()}
+    
+    def count_all_yaml_files(self) -> Dict[str, int]:
+        """
+        Count YAML files in the object without building Path objects.
         
-        return yaml_files
+        Returns:
+            Dictionary with categories as keys and file counts as values
+        """
+        return {category: len(paths) for category, paths in self._yaml_listing().items()}
     
     def get_object_name(self) -> str:
         """
@@ -119,7 +254,16 @@ class FileLocator:
         Returns:
             Object name
         """
-        return self.object_path.name
+        return self._object_name
+    
+    def top_level_entries(self) -> Dict[str, bool]:
+        """
+        List the entries of the object directory.
+        
+        Returns:
+            Dictionary of entry name -> whether it is a directory
+        """
+        return dict(self._snapshot()[0])
     
     def get_structure_summary(self) -> Dict[str, any]:
         """
@@ -128,38 +272,31 @@ class FileLocator:
         Returns:
             Dictionary with structure information
         """
-        summary = {
+        _, counts = self._snapshot()
+        return {
             "object_name": self.get_object_name(),
-            "object_path": str(self.object_path),
-            "creation_flow_exists": (self.object_path / "flows" / self.MAIN_FLOW_FILE).exists(),
-            "directories": [],
-            "yaml_files_count": 0,
-            "python_files_count": 0,
+            "object_path": self._obj_str,
+            "creation_flow_exists": os.path.exists(self._creation_flow_str),
+            "directories": list(counts),
+            "yaml_files_count": sum(yaml_count for yaml_count, _ in counts.values()),
+            "python_files_count": sum(py_count for _, py_count in counts.values()),
         }
-        
-        # Count files in each directory
-        for item in self.object_path.iterdir():
-            if item.is_dir():
-                summary["directories"].append(item.name)
-                
-                # Count YAML files
-                yaml_count = len(list(item.glob("*.yml")))
-                summary["yaml_files_count"] += yaml_count
-                
-                # Count Python files
-                py_count = len(list(item.glob("*.py")))
-                summary["python_files_count"] += py_count
-        
-        return summary
 
 
 class ObjectValidator:
     """Validate BMF object structure."""
     
-    def __init__(self, object_path: str):
-        """Initialize validator."""
-        self.object_path = Path(object_path)
-        self.locator = FileLocator(object_path)
+    def __init__(self, object_path: str, locator: Optional[FileLocator] = None):
+        """
+        Initialize validator.
+        
+        Args:
+            object_path: Path to BMF object directory
+            locator: Existing FileLocator for the same object; pass it in to reuse
+                its validated path and cached directory listings
+        """
+        self.locator = locator or FileLocator(object_path)
+        self.object_path = self.locator.object_path
     
     def validate(self) -> Dict[str, any]:
         """
@@ -176,12 +313,13 @@ class ObjectValidator:
         }
         
         # Check required directories
+        # The locator's cached directory listing answers all required-dir checks
+        top_level = self.locator.top_level_entries()
         for req_dir in FileLocator.REQUIRED_DIRS:
-            dir_path = self.object_path / req_dir
-            if not dir_path.exists():
+            if req_dir not in top_level:
                 results["errors"].append(f"Required directory missing: {req_dir}")
                 results["valid"] = False
-            elif not dir_path.is_dir():
+            elif not top_level[req_dir]:
                 results["errors"].append(f"Required path is not a directory: {req_dir}")
                 results["valid"] = False
         
@@ -194,8 +332,7 @@ class ObjectValidator:
             results["valid"] = False
         
         # Check for YAML files
-        yaml_files = self.locator.find_all_yaml_files()
-        total_yaml = sum(len(files) for files in yaml_files.values())
+        total_yaml = sum(self.locator.count_all_yaml_files().values())
         
         if total_yaml == 0:
             results["warnings"].append("No YAML files found in expected directories")
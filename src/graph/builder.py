@@ -1,17 +1,83 @@
 """BMF Flow Visualizer - Graph Builder for Flow Construction"""
 
+import copy
+import os
+import threading
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
 from src.models.task import Task, Edge, FlowGraph, FlowAnalysis
+from src.parsers import _ast_cache
 from src.parsers.python_parser import ASTPythonParser
-from src.parsers.yaml_parser import YAMLParser, YAMLAnalysis
+from src.parsers.yaml_parser import YAMLAnalysis, parse_yaml_batch
 from src.discovery.file_locator import FileLocator
+from src.utils.compat import DATACLASS_SLOTS
 from src.utils.logger import FlowVisualizerLogger
+from src.config import loader as config
 
 
-@dataclass
+def _adjacency(graph: FlowGraph) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Build successor and predecessor id lists in a single pass over the edges.
+    
+    Mirrors FlowGraph.get_downstream_tasks/get_upstream_tasks: duplicate edges
+    collapse and edges touching unknown tasks are ignored.
+    
+    Returns:
+        Tuple of (successors, predecessors) keyed by task ID
+    """
+    tasks = graph.tasks
+    succ: Dict[str, Dict[str, None]] = {task_id: {} for task_id in tasks}
+    pred: Dict[str, Dict[str, None]] = {task_id: {} for task_id in tasks}
+    for edge in graph.edges:
+        source_id, target_id = edge.source_id, edge.target_id
+        if source_id in tasks and target_id in tasks:
+            succ[source_id][target_id] = None
+            pred[target_id][source_id] = None
+    return (
+        {task_id: list(ids) for task_id, ids in succ.items()},
+        {task_id: list(ids) for task_id, ids in pred.items()},
+    )
+
+
+def _contains_cycle(succ: Dict[str, List[str]]) -> bool:
+    """
+    Detect a cycle with an iterative DFS over successor lists.
+    
+    An explicit stack of (task_id, successor iterator) pairs replaces
+    recursion, so deep linear flows cannot hit the recursion limit.
+    """
+    visited: Set[str] = set()
+    on_path: Set[str] = set()
+    
+    for root in succ:
+        if root in visited:
+            continue
+        visited.add(root)
+        on_path.add(root)
+        stack = [(root, iter(succ[root]))]
+        
+        while stack:
+            task_id, children = stack[-1]
+            for child in children:
+                if child in on_path:
+                    return True
+                if child not in visited:
+                    visited.add(child)
+                    on_path.add(child)
+                    stack.append((child, iter(succ[child])))
+                    break
+            else:
+                # All successors explored - leave the current path
+                stack.pop()
+                on_path.discard(task_id)
+    
+    return False
+
+
+@dataclass(**DATACLASS_SLOTS)
 class GraphBuildResult:
     """Result of graph building operation."""
     graph: FlowGraph
@@ -21,6 +87,75 @@ class GraphBuildResult:
     metadata: Dict[str, any]
 
 
+# Task types that make up the known terminal chain: mapping -> create -> report
+_TERMINAL_CATEGORY = {
+    "Mapping": "mapping", "MapToSchema": "mapping", "TransformMap": "mapping",
+    "CreateObjects": "create", "CreateVeevaObjects": "create",
+    "GenerateReport": "report", "Report": "report", "ExportReport": "report",
+}
+
+class _SubstringIndex:
+    """
+    Find the first of several strings (in priority order) that occurs in a text.
+    
+    Every YAML name ends in its file extension, so instead of testing each
+    candidate with ``in``, the text is scanned for the extensions and only the
+    substrings ending there are looked up - the cost follows the number of
+    extension hits in the text, not the number of candidates.
+    """
+    
+    def __init__(self, items: List[str]):
+        self._items = items
+        self._rank: Dict[str, int] = {}
+        lengths: Dict[str, Set[int]] = {}
+        self._unanchored: List[Tuple[int, str]] = []
+        for rank, item in enumerate(items):
+            if item in self._rank:
+                continue
+            self._rank[item] = rank
+            extension = os.path.splitext(item)[1]
+            if extension:
+                lengths.setdefault(extension, set()).add(len(item))
+            else:
+                self._unanchored.append((rank, item))
+        self._lengths = {extension: sorted(sizes) for extension, sizes in lengths.items()}
+    
+    def first_in(self, text: str) -> Optional[str]:
+        """Return the highest-priority item contained in text, or None."""
+        best: Optional[int] = None
+        for extension, lengths in self._lengths.items():
+            start = text.find(extension)
+            while start != -1:
+                end = start + len(extension)
+                for length in lengths:
+                    if length > end:
+                        break
+                    rank = self._rank.get(text[end - length:end])
+                    if rank is not None and (best is None or rank < best):
+                        best = rank
+                start = text.find(extension, start + 1)
+        for rank, item in self._unanchored:
+            if (best is None or rank < best) and item in text:
+                best = rank
+        return None if best is None else self._items[best]
+
+
+@dataclass
+class _YAMLReferenceIndex:
+    """Lookup structures over the parsed YAML paths, built once per enrichment pass."""
+    stems: List[Tuple[str, str]]
+    by_filename: _SubstringIndex
+    by_path: _SubstringIndex
+    paths_by_filename: Dict[str, str]
+
+
+# Parsed inputs (with the errors and warnings parsing produced) per object
+# path, reused while their sources are unchanged
+_BUILD_CACHE_SIZE = 64
+_build_cache: "OrderedDict[str, Tuple[tuple, FlowAnalysis, Dict[str, YAMLAnalysis], List[str], List[str]]]" = OrderedDict()
+_build_cache_lock = threading.Lock()
+
+
 class GraphBuilder:
     """
     Build complete flow graphs from parsed components.
@@ -92,17 +227,44 @@ class GraphBuilder:
                     metadata=metadata
                 )
             
-            parser = ASTPythonParser(str(flow_path))
-            self.python_analysis = parser.parse()
-            
-            if self.python_analysis.errors:
-                errors.extend(self.python_analysis.errors)
-            if self.python_analysis.warnings:
-                warnings.extend(self.python_analysis.warnings)
+            fingerprint = self._source_fingerprint(flow_path)
+            cache_key = str(self.object_path)
+            entry = None
+            if fingerprint is not None:
+                with _build_cache_lock:
+                    entry = _build_cache.get(cache_key)
+                    if entry is not None and entry[0] == fingerprint:
+                        _build_cache.move_to_end(cache_key)
+                    else:
+                        entry = None
             
-            # Step 2: Parse YAML files
-            self.logger.debug("Step 2: Parsing YAML configuration files")
-            self._parse_yaml_files(errors, warnings)
+            if entry is not None:
+                # Graph building mutates tasks, so each build gets its own copy
+                self.logger.debug(f"Sources unchanged, reusing parsed inputs of {self.object_path}")
+                _, python_analysis, yaml_analyses, parse_errors, parse_warnings = entry
+                self.python_analysis = copy.deepcopy(python_analysis)
+                self.yaml_analyses = dict(yaml_analyses)
+                errors.extend(parse_errors)
+                warnings.extend(parse_warnings)
+            else:
+                self.python_analysis = self._parse_python_cached(flow_path)
+                
+                if self.python_analysis.errors:
+                    errors.extend(self.python_analysis.errors)
+                if self.python_analysis.warnings:
+                    warnings.extend(self.python_analysis.warnings)
+                
+                # Step 2: Parse YAML files
+                self.logger.debug("Step 2: Parsing YAML configuration files")
+                self._parse_yaml_files(errors, warnings)
+                
+                if fingerprint is not None:
+                    inputs = (copy.deepcopy(self.python_analysis), dict(self.yaml_analyses), list(errors), list(warnings))
+                    with _build_cache_lock:
+                        _build_cache[cache_key] = (fingerprint,) + inputs
+                        _build_cache.move_to_end(cache_key)
+                        while len(_build_cache) > _BUILD_CACHE_SIZE:
+                            _build_cache.popitem(last=False)
             
             # Step 3: Build graph from tasks and edges
             self.logger.debug("Step 3: Building graph from parsed data")
@@ -154,32 +316,70 @@ class GraphBuilder:
                 metadata=metadata
             )
     
+    def _source_fingerprint(self, flow_path: Path) -> Optional[tuple]:
+        """
+        Stat every input of a build so unchanged sources can reuse a previous result.
+        
+        Returns:
+            Tuple of task-definition digest and (path, mtime_ns, size) per source
+            file, or None when caching is disabled or a file cannot be stat'ed
+        """
+        if not _ast_cache.enabled():
+            return None
+        
+        sources = [str(flow_path)]
+        for file_list in self.file_locator.find_all_yaml_files().values():
+            sources.extend(map(str, file_list))
+        
+        try:
+            stats = [os.stat(source) for source in sources]
+        except OSError:
+            return None
+        return (
+            config.config_digest("task_definitions"),
+            tuple((source, st.st_mtime_ns, st.st_size) for source, st in zip(sources, stats)),
+        )
+    
     def _parse_yaml_files(self, errors: List[str], warnings: List[str]):
         """Parse all YAML configuration files."""
         yaml_files_dict = self.file_locator.find_all_yaml_files()
+        object_dir = str(self.object_path)
         
         # Iterate through all categories and their files
-        for category, file_list in yaml_files_dict.items():
-            for yaml_path in file_list:
-                try:
-                    parser = YAMLParser(str(yaml_path))
-                    analysis = parser.parse()
-                    
-                    # Store analysis by relative path
-                    rel_path = yaml_path.relative_to(self.object_path)
-                    self.yaml_analyses[str(rel_path)] = analysis
-                    
-                    if analysis.errors:
-                        errors.extend([f"{rel_path}: {err}" for err in analysis.errors])
-                    if analysis.warnings:
-                        warnings.extend([f"{rel_path}: {warn}" for warn in analysis.warnings])
-                        
-                    self.logger.debug(f"Parsed YAML: {rel_path} ({analysis.file_type})")
-                    
-                except Exception as e:
-                    yaml_name = yaml_path.name
-                    warnings.append(f"Failed to parse {yaml_name}: {e}")
-                    self.logger.warning(f"Failed to parse YAML {yaml_path}: {e}")
+        yaml_paths = [yaml_path for file_list in yaml_files_dict.values() for yaml_path in file_list]
+        for yaml_path, analysis in zip(yaml_paths, parse_yaml_batch(yaml_paths)):
+            if isinstance(analysis, Exception):
+                yaml_name = os.path.basename(yaml_path)
+                warnings.append(f"Failed to parse {yaml_name}: {analysis}")
+                self.logger.warning(f"Failed to parse YAML {yaml_path}: {analysis}")
+                continue
+            
+            # Store analysis by relative path (string math, no per-file Path objects)
+            rel_path = os.path.relpath(str(yaml_path), object_dir)
+            self.yaml_analyses[rel_path] = analysis
+            
+            if analysis.errors:
+                errors.extend(f"{rel_path}: {err}" for err in analysis.errors)
+            if analysis.warnings:
+                warnings.extend(f"{rel_path}: {warn}" for warn in analysis.warnings)
+                
+            self.logger.debug(f"Parsed YAML: {rel_path} ({analysis.file_type})")
+    
+    def _parse_python_cached(self, flow_path: Path) -> FlowAnalysis:
+        """Parse creation_flow.py, reusing a cached analysis of identical source."""
+        # Task extraction depends on the configured task types as well as the source
+        key = _ast_cache.make_key(
+            "python", str(flow_path), config.config_digest("task_definitions"), flow_path.read_bytes()
+        )
+        analysis = _ast_cache.load(key)
+        if analysis is not None:
+            self.logger.debug(f"Using cached analysis for {flow_path}")
+            return analysis
+        
+        analysis = ASTPythonParser(str(flow_path)).parse()
+        if not analysis.errors:
+            _ast_cache.store(key, analysis)
+        return analysis
     
     def _build_graph_from_analysis(
         self, 
@@ -199,12 +399,18 @@ class GraphBuilder:
             except Exception as e:
                 errors.append(f"Failed to add task {task.task_id}: {e}")
         
-        # Add all edges to graph
+        # Add all edges to graph, skipping (with the same warning add_edge would
+        # raise) those whose endpoints were not extracted as tasks
+        task_ids = graph.tasks
+        known_edges = []
         for edge in self.python_analysis.edges:
-            try:
-                graph.add_edge(edge)
-            except Exception as e:
-                warnings.append(f"Failed to add edge {edge.source_id}->{edge.target_id}: {e}")
+            if edge.source_id not in task_ids:
+                warnings.append(f"Failed to add edge {edge.source_id}->{edge.target_id}: Source task {edge.source_id} not found")
+            elif edge.target_id not in task_ids:
+                warnings.append(f"Failed to add edge {edge.source_id}->{edge.target_id}: Target task {edge.target_id} not found")
+            else:
+                known_edges.append(edge)
+        graph.add_edges(known_edges)
         
         return graph
 
@@ -217,16 +423,21 @@ class GraphBuilder:
         if not self.graph:
             return
 
-        # Find tasks by type
-        mapping_tasks = [t for t in self.graph.tasks.values() if t.task_type in ("Mapping", "MapToSchema", "TransformMap")]
-        create_tasks = [t for t in self.graph.tasks.values() if t.task_type in ("CreateObjects", "CreateVeevaObjects")]
-        report_tasks = [t for t in self.graph.tasks.values() if t.task_type in ("GenerateReport", "Report", "ExportReport")]
+        # Find tasks by type in a single pass
+        buckets: Dict[str, List[Task]] = {"mapping": [], "create": [], "report": []}
+        for t in self.graph.tasks.values():
+            category = _TERMINAL_CATEGORY.get(t.task_type)
+            if category:
+                buckets[category].append(t)
+        mapping_tasks, create_tasks, report_tasks = buckets["mapping"], buckets["create"], buckets["report"]
+        
+        edge_set = {(e.source_id, e.target_id) for e in self.graph.edges}
 
         # Only apply when unique to avoid ambiguity
         if len(mapping_tasks) == 1 and len(create_tasks) == 1:
             m = mapping_tasks[0].task_id
             c = create_tasks[0].task_id
-            if not any(e.source_id == m and e.target_id == c for e in self.graph.edges):
+            if (m, c) not in edge_set:
                 try:
                     self.graph.add_edge(Edge(source_id=m, target_id=c, label="CreateObjects"))
                     warnings.append("Linked Mapping -> CreateObjects (auto)")
@@ -236,7 +447,7 @@ class GraphBuilder:
         if len(create_tasks) == 1 and len(report_tasks) == 1:
             c = create_tasks[0].task_id
             r = report_tasks[0].task_id
-            if not any(e.source_id == c and e.target_id == r for e in self.graph.edges):
+            if (c, r) not in edge_set:
                 try:
                     self.graph.add_edge(Edge(source_id=c, target_id=r, label="GenerateReport"))
                     warnings.append("Linked CreateObjects -> GenerateReport (auto)")
@@ -245,17 +456,39 @@ class GraphBuilder:
     
     def _enrich_graph_with_yaml(self, errors: List[str], warnings: List[str]):
         """Enrich graph tasks with YAML metadata."""
+        yaml_index = self._build_yaml_index()
+        
         for task_id, task in self.graph.tasks.items():
             # Find YAML files referenced by this task
-            yaml_refs = self._find_yaml_references(task)
+            yaml_refs = self._find_yaml_references(task, yaml_index)
             
             for yaml_ref in yaml_refs:
                 if yaml_ref in self.yaml_analyses:
                     analysis = self.yaml_analyses[yaml_ref]
                     self._add_yaml_metadata_to_task(task, analysis)
     
-    def _find_yaml_references(self, task: Task) -> List[str]:
+    def _build_yaml_index(self) -> _YAMLReferenceIndex:
+        """Split each parsed YAML path once and index filenames and paths for matching."""
+        yaml_paths = list(self.yaml_analyses)
+        filenames = [os.path.basename(yaml_path) for yaml_path in yaml_paths]
+        paths_by_filename: Dict[str, str] = {}
+        for yaml_path, filename in zip(yaml_paths, filenames):
+            paths_by_filename.setdefault(filename, yaml_path)
+        return _YAMLReferenceIndex(
+            stems=[(yaml_path, os.path.splitext(filename)[0]) for yaml_path, filename in zip(yaml_paths, filenames)],
+            by_filename=_SubstringIndex(filenames),
+            by_path=_SubstringIndex(yaml_paths),
+            paths_by_filename=paths_by_filename,
+        )
+    
+    def _find_yaml_references(
+        self, 
+        task: Task, 
+        yaml_index: Optional[_YAMLReferenceIndex] = None
+    ) -> List[str]:
         """Find YAML files referenced in task parameters."""
+        if yaml_index is None:
+            yaml_index = self._build_yaml_index()
         yaml_refs = []
         
         # Check common parameter names for YAML file references
@@ -274,33 +507,25 @@ class GraphBuilder:
                     if param_value == "full_path(...)":
                         # Match based on task name convention
                         # e.g., task "table_merger_gxpd_exports" -> "merging_rules/table_merger_gxpd_exports.yml"
-                        for yaml_path in self.yaml_analyses.keys():
-                            yaml_filename = yaml_path.split('/')[-1].replace('.yml', '').replace('.yaml', '')
+                        for yaml_path, yaml_stem in yaml_index.stems:
                             # Check if task_id contains the yaml filename or vice versa
-                            if yaml_filename in task.task_id or task.task_id in yaml_filename:
+                            if yaml_stem in task.task_id or task.task_id in yaml_stem:
                                 yaml_refs.append(yaml_path)
                     else:
-                        # Try direct filename match first
-                        for yaml_path in self.yaml_analyses.keys():
-                            yaml_filename = yaml_path.split('/')[-1]
-                            if yaml_filename in param_value:
-                                yaml_refs.append(yaml_path)
-                                break
+                        # Try direct filename match first, then partial path match
+                        yaml_filename = yaml_index.by_filename.first_in(param_value)
+                        if yaml_filename is not None:
+                            yaml_refs.append(yaml_index.paths_by_filename[yaml_filename])
                         else:
-                            # Try partial path match
-                            for yaml_path in self.yaml_analyses.keys():
-                                if yaml_path in param_value or param_value.endswith(yaml_path):
-                                    yaml_refs.append(yaml_path)
-                                    break
+                            path_match = yaml_index.by_path.first_in(param_value)
+                            if path_match is not None:
+                                yaml_refs.append(path_match)
         
-        return list(set(yaml_refs))  # Remove duplicates
+        return list(dict.fromkeys(yaml_refs))  # Remove duplicates, keeping match order
     
     def _add_yaml_metadata_to_task(self, task: Task, analysis: YAMLAnalysis):
         """Add YAML analysis metadata to task."""
-        if 'yaml_metadata' not in task.metadata:
-            task.metadata['yaml_metadata'] = {}
-        
-        yaml_meta = task.metadata['yaml_metadata']
+        yaml_meta: Dict[str, Any] = {}
         
         # Add merge rules summary
         if analysis.merge_rules:
@@ -310,68 +535,67 @@ class GraphBuilder:
         # Add filter criteria summary
         if analysis.filter_criteria:
             yaml_meta['filter_count'] = len(analysis.filter_criteria)
-            yaml_meta['filter_types'] = list(set(
+            yaml_meta['filter_types'] = list(dict.fromkeys(
                 c.criteria_type for c in analysis.filter_criteria
             ))
         
         # Add mapping rules summary
         if analysis.mapping_rules:
             yaml_meta['mapping_count'] = len(analysis.mapping_rules)
-            yaml_meta['mapping_actions'] = list(set(
+            yaml_meta['mapping_actions'] = list(dict.fromkeys(
                 rule.action for rule in analysis.mapping_rules
             ))
+        
+        task.metadata.setdefault('yaml_metadata', {}).update(yaml_meta)
     
     def _validate_graph(self) -> List[str]:
         """Validate graph structure and return errors."""
-        errors = []
+        errors: List[str] = []
+        if not self.graph:
+            return errors
+        succ, pred = _adjacency(self.graph)
         
         # Check for isolated tasks
-        isolated = []
-        for task_id in self.graph.tasks:
-            upstream = self.graph.get_upstream_tasks(task_id)
-            downstream = self.graph.get_downstream_tasks(task_id)
-            if not upstream and not downstream:
-                isolated.append(task_id)
+        isolated = [task_id for task_id in self.graph.tasks if not pred[task_id] and not succ[task_id]]
         
         if isolated:
             errors.append(f"Isolated tasks found: {', '.join(isolated)}")
         
-        # Check for cycles
-        if self._has_cycle():
+        # Check for cycles (impossible without edges)
+        if self.graph.edges and self._has_cycle(succ):
             errors.append("Circular dependencies detected in flow")
         
         return errors
     
-    def _has_cycle(self) -> bool:
+    def _has_cycle(self, succ: Optional[Dict[str, List[str]]] = None) -> bool:
         """Detect cycles in graph using DFS."""
-        visited = set()
-        rec_stack = set()
-        
-        def dfs(task_id: str) -> bool:
-            visited.add(task_id)
-            rec_stack.add(task_id)
-            
-            # Check all downstream tasks
-            for downstream_id in self.graph.get_downstream_tasks(task_id):
-                if downstream_id not in visited:
-                    if dfs(downstream_id):
-                        return True
-                elif downstream_id in rec_stack:
-                    return True
-            
-            rec_stack.remove(task_id)
-            return False
-        
-        # Check from all root tasks
-        for task_id in self.graph.tasks:
-            if task_id not in visited:
-                if dfs(task_id):
-                    return True
-        
-        return False
+        if succ is None:
+            if not self.graph:
+                return False
+            succ, _ = _adjacency(self.graph)
+        return _contains_cycle(succ)
+
+class _AdjacencyCacheMixin:
+    """Successor/predecessor lists of ``self.graph``, shared across analysis methods."""
+    
+    graph: FlowGraph
+    _adjacency_cache: Optional[Tuple[tuple, Tuple[Dict[str, List[str]], Dict[str, List[str]]]]] = None
+    
+    def _get_adjacency(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Successor/predecessor lists, rebuilt only when tasks or edges change."""
+        # Tasks are only ever added, so the task count and the graph's edge
+        # revision identify the adjacency without copying the task IDs
+        stamp = (self.graph, len(self.graph.tasks), self.graph.edge_revision)
+        if self._adjacency_cache is None or self._adjacency_cache[0] != stamp:
+            self._adjacency_cache = (stamp, _adjacency(self.graph))
+            self._reset_derived_caches()
+        return self._adjacency_cache[1]
+    
+    def _reset_derived_caches(self):
+        """Drop results computed from a previous adjacency."""
 
 
-class DependencyResolver:
+class DependencyResolver(_AdjacencyCacheMixin):
     """
     Resolve and analyze task dependencies.
     
@@ -388,6 +612,44 @@ class DependencyResolver:
         """
         self.graph = graph
         self.logger = FlowVisualizerLogger.get_logger()
+        self._depth_memo: Dict[str, int] = {}
+        self._layers: Optional[List[List[str]]] = None
+        self._layer_of: Dict[str, int] = {}
+    
+    def _reset_derived_caches(self):
+        self._depth_memo = {}
+        self._layers = None
+        self._layer_of = {}
+    
+    def _topological_layers(self) -> List[List[str]]:
+        """Kahn layering of the graph, computed once per adjacency and shared by the analyses."""
+        succ, pred = self._get_adjacency()
+        if self._layers is not None:
+            return self._layers
+        
+        # Kahn's algorithm: a task joins the layer after its last upstream task
+        indegree = {task_id: len(upstream_ids) for task_id, upstream_ids in pred.items()}
+        position = {task_id: index for index, task_id in enumerate(self.graph.tasks)}
+        
+        layers = []
+        current_layer = [task_id for task_id, degree in indegree.items() if degree == 0]
+        
+        # Tasks on (or downstream of) a cycle never reach zero and are left out
+        while current_layer:
+            layers.append(current_layer)
+            next_layer = []
+            for task_id in current_layer:
+                for downstream_id in succ[task_id]:
+                    indegree[downstream_id] -= 1
+                    if indegree[downstream_id] == 0:
+                        next_layer.append(downstream_id)
+            # Keep each layer in task insertion order, as before
+            next_layer.sort(key=position.__getitem__)
+            current_layer = next_layer
+        
+        self._layers = layers
+        self._layer_of = {task_id: depth for depth, layer in enumerate(layers) for task_id in layer}
+        return layers
     
     def get_execution_order(self) -> List[List[str]]:
         """
@@ -396,56 +658,26 @@ class DependencyResolver:
         Returns:
             List of layers, where each layer contains tasks that can execute in parallel
         """
-        layers = []
-        processed = set()
-        
-        while len(processed) < len(self.graph.tasks):
-            # Find tasks with all dependencies satisfied
-            current_layer = []
-            for task_id in self.graph.tasks:
-                if task_id in processed:
-                    continue
-                
-                # Check if all upstream tasks are processed
-                upstream = self.graph.get_upstream_tasks(task_id)
-                upstream_ids = [u.task_id for u in upstream]
-                if all(u_id in processed for u_id in upstream_ids):
-                    current_layer.append(task_id)
-            
-            if not current_layer:
-                # No progress possible - likely a cycle
-                break
-            
-            layers.append(current_layer)
-            processed.update(current_layer)
-        
-        return layers
+        return [list(layer) for layer in self._topological_layers()]
     
     def find_critical_path(self) -> List[str]:
         """Find the longest path through the graph (critical path)."""
-        # Use dynamic programming to find longest path
-        memo = {}
+        succ, _ = self._get_adjacency()
+        layers = self._topological_layers()
         
-        def longest_path_from(task_id: str) -> int:
-            if task_id in memo:
-                return memo[task_id]
-            
-            downstream = self.graph.get_downstream_tasks(task_id)
-            if not downstream:
-                memo[task_id] = 1
-                return 1
-            
-            downstream_ids = [d.task_id for d in downstream]
-            max_length = 1 + max(longest_path_from(d_id) for d_id in downstream_ids)
-            memo[task_id] = max_length
-            return max_length
+        # Longest path (in tasks) starting at each task, filled in one pass
+        # over the topological order from the sinks back
+        memo: Dict[str, int] = {}
+        for layer in reversed(layers):
+            for task_id in layer:
+                memo[task_id] = 1 + max((memo.get(d_id, 0) for d_id in succ[task_id]), default=0)
         
         # Find task with longest path
         max_length = 0
         start_task = None
         root_tasks = self.graph.get_root_tasks()
         for task in root_tasks:
-            length = longest_path_from(task.task_id)
+            length = memo.get(task.task_id, 0)
             if length > max_length:
                 max_length = length
                 start_task = task.task_id
@@ -457,13 +689,15 @@ class DependencyResolver:
         path = [start_task]
         current = start_task
         while True:
-            downstream = self.graph.get_downstream_tasks(current)
-            if not downstream:
+            downstream_ids = succ[current]
+            if not downstream_ids:
                 break
             
             # Choose downstream task with longest remaining path
-            downstream_ids = [d.task_id for d in downstream]
             next_task = max(downstream_ids, key=lambda t_id: memo.get(t_id, 0))
+            if next_task not in memo:
+                # Only tasks on a cycle remain downstream
+                break
             path.append(next_task)
             current = next_task
         
@@ -471,23 +705,47 @@ class DependencyResolver:
     
     def get_dependency_depth(self, task_id: str) -> int:
         """Get maximum dependency depth for a task."""
-        def depth_from(tid: str, visited: Set[str]) -> int:
-            if tid in visited:
-                return 0
-            
-            visited.add(tid)
-            upstream = self.graph.get_upstream_tasks(tid)
-            
-            if not upstream:
-                return 0
-            
-            upstream_ids = [u.task_id for u in upstream]
-            return 1 + max(depth_from(u_id, visited.copy()) for u_id in upstream_ids)
-        
-        return depth_from(task_id, set())
-
+        _, pred = self._get_adjacency()
+        if task_id not in pred:
+            return 0
+        # Outside of cycles the depth is the task's Kahn layer
+        self._topological_layers()
+        if task_id in self._layer_of:
+            return self._layer_of[task_id]
+        memo = self._depth_memo
+        if task_id in memo:
+            return memo[task_id]
+        
+        # Longest upstream path, memoized across calls; an explicit stack keeps
+        # deep chains clear of the recursion limit
+        depth = {task_id: 0}
+        in_progress = {task_id}
+        stack = [(task_id, iter(pred[task_id]))]
+        
+        while stack:
+            tid, upstream_ids = stack[-1]
+            for u_id in upstream_ids:
+                if u_id in memo:
+                    depth[tid] = max(depth[tid], memo[u_id] + 1)
+                elif u_id in in_progress:
+                    # Back edge of a cycle - count the step but stop there
+                    depth[tid] = max(depth[tid], 1)
+                else:
+                    depth[u_id] = 0
+                    in_progress.add(u_id)
+                    stack.append((u_id, iter(pred[u_id])))
+                    break
+            else:
+                stack.pop()
+                in_progress.discard(tid)
+                memo[tid] = depth[tid]
+                if stack:
+                    parent = stack[-1][0]
+                    depth[parent] = max(depth[parent], depth[tid] + 1)
+        
+        return memo[task_id]
 
-class GraphValidator:
+class GraphValidator(_AdjacencyCacheMixin):
     """
     Validate graph structure and properties.
     
@@ -504,6 +762,10 @@ class GraphValidator:
         """
         self.graph = graph
         self.logger = FlowVisualizerLogger.get_logger()
+        self._components: Optional[List[List[str]]] = None
+    
+    def _reset_derived_caches(self):
+        self._components = None
     
     def validate(self) -> Tuple[bool, List[str], List[str]]:
         """
@@ -529,12 +791,12 @@ class GraphValidator:
         if isolated:
             warnings.append(f"Isolated tasks: {', '.join(isolated)}")
         
-        # Check 4: Check for cycles
-        if self._has_cycles():
+        # Check 4: Check for cycles (impossible without edges)
+        if self.graph.edges and self._has_cycles():
             errors.append("Graph contains cycles")
         
-        # Check 5: Check reachability from roots
-        unreachable = self._find_unreachable_tasks()
+        # Check 5: Check reachability from roots (a single task is its own component)
+        unreachable = self._find_unreachable_tasks() if len(self.graph.tasks) > 1 else []
         if unreachable:
             # Backward-compatible warning text for tests
             warnings.append(f"Unreachable tasks: {', '.join(unreachable)}")
@@ -568,43 +830,13 @@ class GraphValidator:
     
     def _find_isolated_tasks(self) -> List[str]:
         """Find tasks with no connections."""
-        isolated = []
-        
-        for task_id in self.graph.tasks:
-            upstream = self.graph.get_upstream_tasks(task_id)
-            downstream = self.graph.get_downstream_tasks(task_id)
-            if not upstream and not downstream:
-                isolated.append(task_id)
-        
-        return isolated
+        succ, pred = self._get_adjacency()
+        return [task_id for task_id in self.graph.tasks if not pred[task_id] and not succ[task_id]]
     
     def _has_cycles(self) -> bool:
         """Check for cycles using DFS."""
-        visited = set()
-        rec_stack = set()
-        
-        def dfs(task_id: str) -> bool:
-            visited.add(task_id)
-            rec_stack.add(task_id)
-            
-            downstream_tasks = self.graph.get_downstream_tasks(task_id)
-            for downstream in downstream_tasks:
-                downstream_id = downstream.task_id
-                if downstream_id not in visited:
-                    if dfs(downstream_id):
-                        return True
-                elif downstream_id in rec_stack:
-                    return True
-            
-            rec_stack.remove(task_id)
-            return False
-        
-        for task_id in self.graph.tasks:
-            if task_id not in visited:
-                if dfs(task_id):
-                    return True
-        
-        return False
+        succ, _ = self._get_adjacency()
+        return _contains_cycle(succ)
     
     def _find_unreachable_tasks(self) -> List[str]:
         """
@@ -636,28 +868,26 @@ class GraphValidator:
         if not self.graph.tasks:
             return []
         
-        # Undirected adjacency for weak connectivity
-        adjacency = {task_id: set() for task_id in self.graph.tasks}
-        for edge in self.graph.edges:
-            # Guard against invalid edges referencing missing tasks
-            if edge.source_id in adjacency and edge.target_id in adjacency:
-                adjacency[edge.source_id].add(edge.target_id)
-                adjacency[edge.target_id].add(edge.source_id)
+        # Weak connectivity: follow edges in both directions
+        succ, pred = self._get_adjacency()
+        if self._components is not None:
+            return self._components
         
         visited: Set[str] = set()
         components: List[List[str]] = []
         
         def bfs(start_id: str) -> List[str]:
             comp: List[str] = []
-            q = [start_id]
+            q = deque((start_id,))
             visited.add(start_id)
             while q:
-                cur = q.pop(0)
+                cur = q.popleft()
                 comp.append(cur)
-                for nb in adjacency[cur]:
-                    if nb not in visited:
-                        visited.add(nb)
-                        q.append(nb)
+                for neighbours in (succ[cur], pred[cur]):
+                    for nb in neighbours:
+                        if nb not in visited:
+                            visited.add(nb)
+                            q.append(nb)
             return comp
         
         for tid in self.graph.tasks:
@@ -665,11 +895,12 @@ class GraphValidator:
                 components.append(bfs(tid))
         
         if len(components) <= 1:
-            return []
-        
-        # Primary component is the largest by node count
-        primary = max(components, key=len)
-        return [c for c in components if c is not primary]
+            self._components = []
+        else:
+            # Primary component is the largest by node count
+            primary = max(components, key=len)
+            self._components = [c for c in components if c is not primary]
+        return self._components
     
     def _validate_task_ids(self) -> List[str]:
         """Validate task IDs are non-empty and unique."""
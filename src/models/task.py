@@ -4,16 +4,17 @@ BMF Flow Visualizer - Core Models
 Data structures for representing Prefect flow components.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from pydantic import BaseModel, Field
+
+from src.utils.compat import DATACLASS_SLOTS
 
 
 # ============================================================================
 # Task Model
 # ============================================================================
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Task:
     """
     Represents a single task in a Prefect flow.
@@ -51,6 +52,10 @@ class Task:
         """Add or update metadata."""
         self.metadata[key] = value
     
+    def update_metadata(self, values: Dict[str, Any]):
+        """Add or update several metadata entries at once."""
+        self.metadata.update(values)
+    
     def get_display_label(self) -> str:
         """Get formatted display label for diagram."""
         return f"{self.task_name}"
@@ -60,11 +65,14 @@ class Task:
 # Edge Model
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class Edge:
     """
     Represents a dependency edge between two tasks.
     
+    Edges are frozen: their hash keys the graph's edge index, so the
+    endpoints must not change once an edge has been added.
+    
     Attributes:
         source_id: ID of source task
         target_id: ID of target task
@@ -99,7 +107,7 @@ class FlowGraph:
         object_name: Name of the Veeva object
         object_path: Path to the object directory
         tasks: Dictionary of task_id -> Task
-        edges: List of edges
+        edges: Tuple of edges, replaced as a whole or extended with add_edge
         metadata: Flow-level metadata
     """
     
@@ -107,8 +115,14 @@ class FlowGraph:
         self.object_name = object_name
         self.object_path = object_path
         self.tasks: Dict[str, Task] = {}
-        self.edges: List[Edge] = []
+        self._edges: List[Edge] = []
+        self._edges_view: Optional[Tuple[Edge, ...]] = ()
+        self._edge_revision = 0
         self.metadata: Dict[str, Any] = {}
+        # Edge index (dedup keys and adjacency), updated with every edge change
+        self._edge_keys: Set[Tuple[str, str]] = set()
+        self._upstream: Dict[str, Dict[str, None]] = {}
+        self._downstream: Dict[str, Dict[str, None]] = {}
     
     def add_task(self, task: Task):
         """Add a task to the graph."""
@@ -116,6 +130,50 @@ class FlowGraph:
             raise ValueError(f"Task {task.task_id} already exists")
         self.tasks[task.task_id] = task
     
+    def add_tasks(self, tasks: Iterable[Task]):
+        """Add several tasks; none are added if any ID is taken or repeated."""
+        new_tasks: Dict[str, Task] = {}
+        for task in tasks:
+            if task.task_id in self.tasks or task.task_id in new_tasks:
+                raise ValueError(f"Task {task.task_id} already exists")
+            new_tasks[task.task_id] = task
+        self.tasks.update(new_tasks)
+    
+    @property
+    def edges(self) -> Tuple[Edge, ...]:
+        """Edges in insertion order (read-only; use add_edge or assign a new sequence)."""
+        if self._edges_view is None:
+            self._edges_view = tuple(self._edges)
+        return self._edges_view
+    
+    @edges.setter
+    def edges(self, edges: Iterable[Edge]):
+        # Replaces every edge as given; unlike add_edge, endpoints aren't checked
+        self._edges = []
+        self._edge_keys = set()
+        self._upstream = {}
+        self._downstream = {}
+        for edge in edges:
+            self._edges.append(edge)
+            self._index_edge(edge)
+        self._edges_changed()
+    
+    @property
+    def edge_revision(self) -> int:
+        """Counter that changes whenever edges are added or replaced."""
+        return self._edge_revision
+    
+    def _edges_changed(self):
+        """Drop the cached edges tuple and move to a new edge revision."""
+        self._edges_view = None
+        self._edge_revision += 1
+    
+    def _index_edge(self, edge: Edge):
+        """Record one edge in the dedup set and both adjacency maps."""
+        self._edge_keys.add((edge.source_id, edge.target_id))
+        self._upstream.setdefault(edge.target_id, {})[edge.source_id] = None
+        self._downstream.setdefault(edge.source_id, {})[edge.target_id] = None
+    
     def add_edge(self, edge: Edge):
         """Add an edge to the graph."""
         # Check if source and target tasks exist
@@ -124,9 +182,30 @@ class FlowGraph:
         if edge.target_id not in self.tasks:
             raise ValueError(f"Target task {edge.target_id} not found")
         
-        # Avoid duplicate edges
-        if edge not in self.edges:
-            self.edges.append(edge)
+        # Avoid duplicate edges (Edge equality is by endpoints)
+        if (edge.source_id, edge.target_id) not in self._edge_keys:
+            self._edges.append(edge)
+            self._index_edge(edge)
+            self._edges_changed()
+    
+    def add_edges(self, edges: Iterable[Edge]):
+        """Add several edges; none are added if any endpoint is missing."""
+        edges = list(edges)
+        tasks = self.tasks
+        for edge in edges:
+            if edge.source_id not in tasks:
+                raise ValueError(f"Source task {edge.source_id} not found")
+            if edge.target_id not in tasks:
+                raise ValueError(f"Target task {edge.target_id} not found")
+        
+        edge_keys = self._edge_keys
+        count = len(self._edges)
+        for edge in edges:
+            if (edge.source_id, edge.target_id) not in edge_keys:
+                self._edges.append(edge)
+                self._index_edge(edge)
+        if len(self._edges) != count:
+            self._edges_changed()
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get a task by ID."""
@@ -134,29 +213,68 @@ class FlowGraph:
     
     def get_upstream_tasks(self, task_id: str) -> List[Task]:
         """Get all upstream tasks."""
-        upstream_ids = set()
-        for edge in self.edges:
-            if edge.target_id == task_id:
-                upstream_ids.add(edge.source_id)
-        return [self.tasks[tid] for tid in upstream_ids if tid in self.tasks]
+        return [self.tasks[tid] for tid in self._upstream.get(task_id, ()) if tid in self.tasks]
     
     def get_downstream_tasks(self, task_id: str) -> List[Task]:
         """Get all downstream tasks."""
-        downstream_ids = set()
-        for edge in self.edges:
-            if edge.source_id == task_id:
-                downstream_ids.add(edge.target_id)
-        return [self.tasks[tid] for tid in downstream_ids if tid in self.tasks]
+        return [self.tasks[tid] for tid in self._downstream.get(task_id, ()) if tid in self.tasks]
     
     def get_root_tasks(self) -> List[Task]:
         """Get all root tasks (no upstream dependencies)."""
-        target_ids = set(edge.target_id for edge in self.edges)
-        return [task for task in self.tasks.values() if task.task_id not in target_ids]
+        return [task for task_id, task in self.tasks.items() if task_id not in self._upstream]
     
     def get_leaf_tasks(self) -> List[Task]:
         """Get all leaf tasks (no downstream dependencies)."""
-        source_ids = set(edge.source_id for edge in self.edges)
-        return [task for task in self.tasks.values() if task.task_id not in source_ids]
+        return [task for task_id, task in self.tasks.items() if task_id not in self._downstream]
+    
+    def get_roots_and_leaves(self) -> Tuple[List[Task], List[Task]]:
+        """Get root and leaf tasks together in a single pass over the tasks."""
+        roots: List[Task] = []
+        leaves: List[Task] = []
+        for task_id, task in self.tasks.items():
+            if task_id not in self._upstream:
+                roots.append(task)
+            if task_id not in self._downstream:
+                leaves.append(task)
+        return roots, leaves
+    
+    def find_cycles(self) -> List[List[str]]:
+        """
+        Find dependency cycles with an iterative three-colour DFS.
+        
+        Each back-edge found yields one cycle, listed from the task the
+        back-edge returns to round to the task it leaves, so an acyclic
+        graph gives an empty list.
+        
+        Returns:
+            List of cycles, each a list of task IDs
+        """
+        # 0 = unvisited, 1 = on the current DFS path, 2 = finished
+        color = dict.fromkeys(self.tasks, 0)
+        cycles: List[List[str]] = []
+        
+        for root in self.tasks:
+            if color[root]:
+                continue
+            color[root] = 1
+            path = [root]
+            stack = [iter(self._downstream.get(root, ()))]
+            
+            while stack:
+                nxt = next(stack[-1], None)
+                if nxt is None:
+                    color[path.pop()] = 2
+                    stack.pop()
+                    continue
+                state = color.get(nxt)
+                if state == 1:
+                    cycles.append(path[path.index(nxt):])
+                elif state == 0:
+                    color[nxt] = 1
+                    path.append(nxt)
+                    stack.append(iter(self._downstream.get(nxt, ())))
+        
+        return cycles
     
     def validate(self) -> List[str]:
         """
@@ -167,17 +285,15 @@ class FlowGraph:
         """
         errors = []
         
-        # Check for orphaned tasks
-        all_edge_task_ids = set()
-        for edge in self.edges:
-            all_edge_task_ids.add(edge.source_id)
-            all_edge_task_ids.add(edge.target_id)
-        
-        task_ids = set(self.tasks.keys())
+        # Check for orphaned tasks against the edge index
+        task_ids = self.tasks.keys()
         
         # Tasks with no edges are okay (independent tasks)
         # But we should warn about them
-        isolated = task_ids - all_edge_task_ids
+        isolated = [
+            task_id for task_id in self.tasks
+            if task_id not in self._upstream and task_id not in self._downstream
+        ]
         if isolated:
             errors.append(f"Isolated tasks (no dependencies): {', '.join(isolated)}")
         
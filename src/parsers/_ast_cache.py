@@ -0,0 +1,73 @@
+"""BMF Flow Visualizer - On-disk Cache for Parser Results"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from src.utils.cache_dirs import private_cache_dir
+
+
+# Bump when parser output changes so entries written by older versions are ignored
+CACHE_VERSION = "4"
+
+# Set to any non-empty value to bypass the cache (always parse)
+DISABLE_ENV_VAR = "BMF_FLOW_VIZ_NO_CACHE"
+
+
+def _cache_dir() -> Optional[Path]:
+    """Cache location: $XDG_CACHE_HOME/bmf_flow_viz/ast (default ~/.cache), or None if unsafe."""
+    return private_cache_dir("ast")
+
+
+def enabled() -> bool:
+    """Whether cached parse results may be used."""
+    return not os.environ.get(DISABLE_ENV_VAR)
+
+
+def make_key(*parts: Union[str, bytes]) -> str:
+    """Build a cache key from the parser version and the given inputs."""
+    digest = hashlib.sha256(CACHE_VERSION.encode("utf-8"))
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        # Length-prefix each part so different splits can't collide
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def load(key: str) -> Optional[Any]:
+    """Return the cached object for key, or None on a miss or unreadable entry."""
+    if not enabled():
+        return None
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    try:
+        with open(cache_dir / f"{key}.pickle", "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Corrupt or incompatible entry (e.g. written by a different model layout)
+        return None
+
+
+def store(key: str, obj: Any):
+    """Atomically write obj to the cache; failures are ignored."""
+    if not enabled():
+        return
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return
+    tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_dir / f"{key}.pickle")
+    except Exception:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
@@ -1,14 +1,37 @@
 """BMF Flow Visualizer - AST-Based Python Parser"""
 
 import ast
+import logging
+import os
+from collections import deque
+import stat
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Callable, Dict, List, Any, Optional, Tuple, Set, cast
 from dataclasses import dataclass
 
 from src.models.task import Task, Edge, FlowAnalysis
 from src.utils.logger import FlowVisualizerLogger
-from src.config.loader import ConfigLoader
+from src.config import loader as config
+
+
+# Dependency-setting methods: name -> (keyword listing the other tasks (None for
+# task/task_list), whether those tasks are upstream of the receiver)
+_DEPENDENCY_METHODS: Dict[str, Tuple[Optional[str], bool]] = {
+    "set_upstream": (None, True),
+    "set_downstream": (None, False),
+    "set_dependencies": ("upstream_tasks", True),
+}
+
+# Default keywords naming tasks in set_upstream/set_downstream calls
+_TASK_PARAM_NAMES = frozenset({"task", "task_list"})
+
+# Constructor keywords whose task references imply a data dependency
+_IMPLICIT_KWARGS = frozenset({"input_table", "input_paths"})
+
+# Node classes that can contain statements; expressions never do, so the
+# traversal can skip their subtrees (match_case exists from Python 3.10)
+_STATEMENT_NODES = (ast.stmt, ast.excepthandler) + ((ast.match_case,) if hasattr(ast, "match_case") else ())
 
 
 class ASTPythonParser:
@@ -31,24 +54,31 @@ class ASTPythonParser:
         """
         self.flow_py_path = Path(flow_py_path)
         self.logger = FlowVisualizerLogger.get_logger()
-        self.config = ConfigLoader.get_instance()
         
-        self._validate_file()
         self._read_file()
+        
+        # Statement nodes of the parsed source, kept for repeat parse() calls
+        self._nodes: Optional[Tuple[List[ast.Assign], List[ast.Call]]] = None
+        # Whether DEBUG is enabled, refreshed at the start of each parse()
+        self._debug = False
     
-    def _validate_file(self):
-        """Validate that file exists and is readable."""
-        if not self.flow_py_path.exists():
+    def _read_file(self):
+        """Validate that the file is a readable .py file and store its contents."""
+        # Check the file type before opening: open() on a FIFO blocks until a
+        # writer appears, and a device isn't source code either
+        try:
+            st = os.stat(self.flow_py_path)
+        except (FileNotFoundError, NotADirectoryError):
             raise FileNotFoundError(f"Flow file not found: {self.flow_py_path}")
+        except OSError as e:
+            raise IOError(f"Failed to read file: {e}")
         
-        if not self.flow_py_path.is_file():
+        if not stat.S_ISREG(st.st_mode):
             raise FileNotFoundError(f"Path is not a file: {self.flow_py_path}")
         
         if not self.flow_py_path.suffix == ".py":
             raise ValueError(f"File must be .py file: {self.flow_py_path}")
-    
-    def _read_file(self):
-        """Read and store file contents."""
+        
         try:
             with open(self.flow_py_path, 'r', encoding='utf-8') as f:
                 self.source_code = f.read()
@@ -63,6 +93,8 @@ class ASTPythonParser:
             FlowAnalysis object with extracted tasks, edges, and metadata
         """
         self.logger.info(f"Parsing flow file: {self.flow_py_path}")
+        # Per-node debug messages are only formatted when they will be emitted
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
         
         # Extract object name: file is at <object>/flows/creation_flow.py
         # Go up 2 levels to get to <object>/
@@ -73,29 +105,41 @@ class ASTPythonParser:
         )
         
         try:
-            # Parse Python code into AST
-            tree = ast.parse(self.source_code)
-            self.logger.debug("Successfully parsed Python AST")
+            # Parse Python code into AST once per parser; source_code is fixed
+            # at construction, so the tree never goes stale
+            if self._nodes is None:
+                tree = ast.parse(self.source_code)
+                self.logger.debug("Successfully parsed Python AST")
+                
+                # Single traversal collecting the nodes every later step needs
+                self._nodes = self._collect_nodes(tree)
+            assigns, method_calls = self._nodes
             
             # Variable tracking for resolution
             self.variables: Dict[str, Any] = {}
             self.task_assignments: Dict[str, Tuple[int, str]] = {}  # var_name -> (line, task_type)
             
-            # First pass: extract task definitions
-            analysis.tasks = self._extract_task_definitions(tree)
+            # Extract task definitions
+            analysis.tasks = self._extract_task_definitions(assigns)
             self.logger.info(f"Extracted {len(analysis.tasks)} tasks")
+            # Known task ids, shared by both dependency passes
+            task_ids = {task.task_id for task in analysis.tasks}
             
-            # Second pass: extract dependencies
-            analysis.edges = self._extract_dependencies(tree, analysis.tasks)
+            # Extract dependencies
+            analysis.edges = self._extract_dependencies(method_calls, task_ids)
             self.logger.info(f"Extracted {len(analysis.edges)} dependencies")
             
-            # Third pass: extract parameters and metadata
-            self._enrich_tasks(tree, analysis.tasks)
+            # Extract parameters and metadata
+            self._enrich_tasks(analysis.tasks)
             
-            # Fourth pass: extract implicit dependencies from constructor arguments
-            implicit_edges = self._extract_implicit_dependencies(tree, analysis.tasks)
+            # Extract implicit dependencies from constructor arguments
+            implicit_edges = self._extract_implicit_dependencies(assigns, task_ids)
+            # Edge equality is by endpoints; a set keeps the merge linear
+            seen = {(edge.source_id, edge.target_id) for edge in analysis.edges}
             for edge in implicit_edges:
-                if edge not in analysis.edges:
+                key = (edge.source_id, edge.target_id)
+                if key not in seen:
+                    seen.add(key)
                     analysis.edges.append(edge)
             self.logger.info(f"Extracted {len(implicit_edges)} implicit dependencies from constructor args")
             
@@ -114,53 +158,84 @@ class ASTPythonParser:
         
         return analysis
     
-    def _extract_task_definitions(self, tree: ast.AST) -> List[Task]:
+    def _collect_nodes(self, tree: ast.AST) -> Tuple[List[ast.Assign], List[ast.Call]]:
+        """
+        Walk the AST once, keeping the node shapes the extractors look at.
+        
+        Nodes are returned in ast.walk (breadth-first) order, so tasks and
+        edges come out in the same order as separate walks would produce.
+        Assignments and expression statements only occur inside statement
+        bodies, so expression subtrees are never descended into.
+        
+        Args:
+            tree: AST tree
+            
+        Returns:
+            Tuple of (assignments ``name = Call(...)``, method-call expression statements)
+        """
+        assigns = []
+        method_calls = []
+        
+        queue = deque((tree,))
+        while queue:
+            node = queue.popleft()
+            queue.extend(child for child in ast.iter_child_nodes(node) if isinstance(child, _STATEMENT_NODES))
+            
+            if isinstance(node, ast.Assign):
+                if (len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                        and isinstance(node.value, ast.Call)):
+                    assigns.append(node)
+            elif isinstance(node, ast.Expr):
+                if isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Attribute):
+                    method_calls.append(node.value)
+        
+        return assigns, method_calls
+    
+    def _extract_task_definitions(self, assigns: List[ast.Assign]) -> List[Task]:
         """
-        Extract all task definitions from the AST.
+        Extract all task definitions from the collected assignments.
         
         Looks for patterns like:
             task_var = TaskType(parameters...)
         
         Args:
-            tree: AST tree
+            assigns: ``name = Call(...)`` assignments from _collect_nodes
             
         Returns:
             List of Task objects
         """
         tasks = []
-        task_types = set(self.config.get_task_definitions().keys())
+        task_types = config.get_task_types()
         
-        for node in ast.walk(tree):
-            # Look for assignments
-            if isinstance(node, ast.Assign):
-                # Get assignment target (variable name)
-                if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
-                    var_name = node.targets[0].id
-                    
-                    # Check if RHS is a task instantiation
-                    if isinstance(node.value, ast.Call):
-                        task_type = self._get_call_name(node.value)
-                        
-                        if task_type in task_types:
-                            task_name = self._extract_task_name(node.value)
-                            
-                            task = Task(
-                                task_id=var_name,
-                                task_type=task_type,
-                                task_name=task_name or var_name,
-                                line_number=node.lineno,
-                                file_path=str(self.flow_py_path),
-                            )
-                            
-                            # Extract parameters
-                            params = self._extract_parameters(node.value)
-                            task.parameters = params
-                            
-                            tasks.append(task)
-                            self.task_assignments[var_name] = (node.lineno, task_type)
-                            self.variables[var_name] = task
-                            
-                            self.logger.debug(f"Found task: {var_name} ({task_type})")
+        for node in assigns:
+            # Get assignment target (variable name)
+            var_name = cast(ast.Name, node.targets[0]).id
+            call = cast(ast.Call, node.value)
+            
+            # Check if RHS is a task instantiation
+            task_type = self._get_call_name(call)
+            
+            if task_type in task_types:
+                task_name = self._extract_task_name(call)
+                
+                task = Task(
+                    task_id=var_name,
+                    task_type=task_type,
+                    task_name=task_name or var_name,
+                    line_number=node.lineno,
+                    file_path=str(self.flow_py_path),
+                )
+                
+                # Extract parameters
+                params = self._extract_parameters(call)
+                task.parameters = params
+                
+                tasks.append(task)
+                self.task_assignments[var_name] = (node.lineno, task_type)
+                self.variables[var_name] = task
+                
+                if self._debug:
+                    self.logger.debug("Found task: %s (%s)", var_name, task_type)
         
         return tasks
     
@@ -179,11 +254,14 @@ class ASTPythonParser:
         
         return None
     
-    def _extract_task_name(self, call_node: ast.Call) -> Optional[str]:
+    def _extract_task_name(self, call_node: ast.Call) -> Any:
         """
         Extract task display name from task_args(name=...).
         
         Looks for: task_args=dict(name="Display Name")
+        
+        Returns:
+            The constant given as name (normally a str), or None
         """
         for keyword in call_node.keywords:
             if keyword.arg == "task_args":
@@ -193,8 +271,6 @@ class ASTPythonParser:
                         if inner_kw.arg == "name":
                             if isinstance(inner_kw.value, ast.Constant):
                                 return inner_kw.value.value
-                            elif isinstance(inner_kw.value, ast.Str):  # Python 3.7 compat
-                                return inner_kw.value.s
         
         return None
     
@@ -207,7 +283,7 @@ class ASTPythonParser:
         - Variable references: param=variable_name
         - Function calls: param=full_path(...)
         """
-        params = {}
+        params: Dict[Any, Any] = {}  # **kwargs entries are keyed by None
         
         for keyword in call_node.keywords:
             param_name = keyword.arg
@@ -227,52 +303,52 @@ class ASTPythonParser:
         - Dictionaries
         - Lists
         """
-        # Constant values
-        if isinstance(node, ast.Constant):
-            return node.value
-        elif isinstance(node, ast.Str):  # Python 3.7 compat
-            return node.s
-        elif isinstance(node, ast.Num):  # Python 3.7 compat
-            return node.n
-        elif isinstance(node, ast.NameConstant):  # Python 3.7 compat
-            return node.value
-        
+        # Dispatch on the concrete node class; unsupported nodes resolve to None
+        resolver = self._RESOLVERS.get(type(node))
+        return resolver(self, node) if resolver else None
+    
+    def _resolve_constant(self, node: ast.Constant) -> Any:
+        return node.value
+    
+    def _resolve_name(self, node: ast.Name) -> str:
         # Variable references
-        elif isinstance(node, ast.Name):
-            return node.id
-        
-        # Function calls
-        elif isinstance(node, ast.Call):
-            func_name = self._get_call_name(node)
-            return f"{func_name}(...)"  # Simplified representation
-        
-        # Dictionary literals
-        elif isinstance(node, ast.Dict):
-            result = {}
-            for k, v in zip(node.keys, node.values):
-                key = self._resolve_value(k) if k else None
-                val = self._resolve_value(v)
-                if key:
-                    result[key] = val
-            return result
-        
-        # List literals
-        elif isinstance(node, ast.List):
-            return [self._resolve_value(elt) for elt in node.elts]
-        
-        # Tuple literals
-        elif isinstance(node, ast.Tuple):
-            return tuple(self._resolve_value(elt) for elt in node.elts)
-        
-        # Attribute access
-        elif isinstance(node, ast.Attribute):
-            value = self._resolve_value(node.value)
-            return f"{value}.{node.attr}"
-        
-        # Default: return None
-        return None
+        return node.id
+    
+    def _resolve_call(self, node: ast.Call) -> str:
+        func_name = self._get_call_name(node)
+        return f"{func_name}(...)"  # Simplified representation
+    
+    def _resolve_dict(self, node: ast.Dict) -> Dict[Any, Any]:
+        result = {}
+        for k, v in zip(node.keys, node.values):
+            key = self._resolve_value(k) if k else None
+            val = self._resolve_value(v)
+            if key:
+                result[key] = val
+        return result
+    
+    def _resolve_list(self, node: ast.List) -> List[Any]:
+        return [self._resolve_value(elt) for elt in node.elts]
+    
+    def _resolve_tuple(self, node: ast.Tuple) -> Tuple[Any, ...]:
+        return tuple(self._resolve_value(elt) for elt in node.elts)
     
-    def _extract_dependencies(self, tree: ast.AST, tasks: List[Task]) -> List[Edge]:
+    def _resolve_attribute(self, node: ast.Attribute) -> str:
+        value = self._resolve_value(node.value)
+        return f"{value}.{node.attr}"
+    
+    # ast.Str/Num/NameConstant are aliases of ast.Constant since Python 3.8
+    _RESOLVERS: Dict[type, Callable[[Any, Any], Any]] = {
+        ast.Constant: _resolve_constant,
+        ast.Name: _resolve_name,
+        ast.Call: _resolve_call,
+        ast.Dict: _resolve_dict,
+        ast.List: _resolve_list,
+        ast.Tuple: _resolve_tuple,
+        ast.Attribute: _resolve_attribute,
+    }
+    
+    def _extract_dependencies(self, method_calls: List[ast.Call], task_ids: Set[str]) -> List[Edge]:
         """
         Extract task dependencies from set_upstream, set_downstream, and set_dependencies calls.
         
@@ -282,78 +358,43 @@ class ASTPythonParser:
             task_a.set_dependencies(upstream_tasks=[task_b, task_c])
         
         Args:
-            tree: AST tree
-            tasks: List of extracted tasks
+            method_calls: Method-call expression statements from _collect_nodes
+            task_ids: IDs of the extracted tasks
             
         Returns:
             List of Edge objects
         """
         edges = []
-        task_ids = {task.task_id for task in tasks}
-        
-        for node in ast.walk(tree):
-            # Look for method calls on task variables
-            if isinstance(node, ast.Expr):
-                if isinstance(node.value, ast.Call):
-                    call = node.value
-                    
-                    # Check for .set_upstream or .set_downstream or .set_dependencies
-                    if isinstance(call.func, ast.Attribute):
-                        method_name = call.func.attr
-                        
-                        if method_name == "set_upstream":
-                            # obj.set_upstream(task=...)
-                            target_id = self._get_call_object(call.func)
-                            
-                            # Extract upstream tasks from arguments
-                            upstream_ids = self._extract_task_list_from_call(call)
-                            
-                            for upstream_id in upstream_ids:
-                                if upstream_id in task_ids and target_id in task_ids:
-                                    edge = Edge(
-                                        source_id=upstream_id,
-                                        target_id=target_id,
-                                        edge_type="dependency"
-                                    )
-                                    if edge not in edges:
-                                        edges.append(edge)
-                                    self.logger.debug(f"Found dependency: {upstream_id} -> {target_id}")
-                        
-                        elif method_name == "set_downstream":
-                            # obj.set_downstream(task=...)
-                            source_id = self._get_call_object(call.func)
-                            
-                            # Extract downstream tasks from arguments
-                            downstream_ids = self._extract_task_list_from_call(call)
-                            
-                            for downstream_id in downstream_ids:
-                                if source_id in task_ids and downstream_id in task_ids:
-                                    edge = Edge(
-                                        source_id=source_id,
-                                        target_id=downstream_id,
-                                        edge_type="dependency"
-                                    )
-                                    if edge not in edges:
-                                        edges.append(edge)
-                                    self.logger.debug(f"Found dependency: {source_id} -> {downstream_id}")
-                        
-                        elif method_name == "set_dependencies":
-                            # obj.set_dependencies(upstream_tasks=[...])
-                            target_id = self._get_call_object(call.func)
-                            
-                            # Extract upstream tasks from 'upstream_tasks' parameter
-                            upstream_ids = self._extract_task_list_from_call(call, param_name="upstream_tasks")
-                            
-                            for upstream_id in upstream_ids:
-                                if upstream_id in task_ids and target_id in task_ids:
-                                    edge = Edge(
-                                        source_id=upstream_id,
-                                        target_id=target_id,
-                                        edge_type="dependency"
-                                    )
-                                    if edge not in edges:
-                                        edges.append(edge)
-                                    self.logger.debug(f"Found dependency via set_dependencies: {upstream_id} -> {target_id}")
+        seen: Set[Tuple[str, str]] = set()
+        
+        # Look for .set_upstream, .set_downstream or .set_dependencies on task variables
+        for call in method_calls:
+            method = cast(ast.Attribute, call.func)
+            method_name = method.attr
+            spec = _DEPENDENCY_METHODS.get(method_name)
+            # Only keyword arguments name tasks, so bare calls add no edges
+            if spec is None or not call.keywords:
+                continue
+            
+            param_name, others_upstream = spec
+            receiver_id = self._get_call_object(method)
+            if receiver_id not in task_ids:
+                continue
+            
+            for other_id in self._extract_task_list_from_call(call, param_name=param_name):
+                if other_id not in task_ids:
+                    continue
+                
+                source_id, target_id = (other_id, receiver_id) if others_upstream else (receiver_id, other_id)
+                if (source_id, target_id) not in seen:
+                    seen.add((source_id, target_id))
+                    edges.append(Edge(
+                        source_id=source_id,
+                        target_id=target_id,
+                        edge_type="dependency"
+                    ))
+                if self._debug:
+                    self.logger.debug("Found dependency via %s: %s -> %s", method_name, source_id, target_id)
         
         return edges
     
@@ -385,7 +426,7 @@ class ASTPythonParser:
         task_ids = []
         
         # Determine which parameter names to check
-        param_names = [param_name] if param_name else ("task", "task_list")
+        param_names = {param_name} if param_name else _TASK_PARAM_NAMES
         
         for keyword in call_node.keywords:
             if keyword.arg in param_names:
@@ -398,10 +439,14 @@ class ASTPythonParser:
                 # Handle single task
                 elif isinstance(keyword.value, ast.Name):
                     task_ids.append(keyword.value.id)
+                
+                # Keywords are unique within a call, so an explicit name matches once
+                if param_name:
+                    break
         
         return task_ids
     
-    def _enrich_tasks(self, tree: ast.AST, tasks: List[Task]):
+    def _enrich_tasks(self, tasks: List[Task]):
         """
         Enrich task metadata with additional information.
         
@@ -409,19 +454,22 @@ class ASTPythonParser:
         - Color based on task type
         - Category
         """
+        task_defs = config.get_task_definitions()
         for task in tasks:
             # Get task definition for color
-            task_def = self.config.get_task_def(task.task_type)
+            task_def = task_defs.get(task.task_type)
             
             if task_def:
-                task.set_metadata("color", task_def.get("color", "#F5F5F5"))
-                task.set_metadata("category", task_def.get("category", "unknown"))
-                task.set_metadata("icon", task_def.get("icon", ""))
-            
-            # Add display label
-            task.set_metadata("display_label", task.get_display_label())
+                task.update_metadata({
+                    "color": task_def.get("color", "#F5F5F5"),
+                    "category": task_def.get("category", "unknown"),
+                    "icon": task_def.get("icon", ""),
+                    "display_label": task.get_display_label(),
+                })
+            else:
+                task.set_metadata("display_label", task.get_display_label())
 
-    def _extract_implicit_dependencies(self, tree: ast.AST, tasks: List[Task]) -> List[Edge]:
+    def _extract_implicit_dependencies(self, assigns: List[ast.Assign], task_ids: Set[str]) -> List[Edge]:
         """
         Extract implicit dependencies from constructor parameters.
         
@@ -430,42 +478,38 @@ class ASTPythonParser:
             task_a = TaskType(input_paths=[task_b, task_c], ...)
         
         Args:
-            tree: AST tree
-            tasks: List of extracted tasks
+            assigns: ``name = Call(...)`` assignments from _collect_nodes
+            task_ids: IDs of the extracted tasks
             
         Returns:
             List of Edge objects representing implicit dependencies
         """
         edges = []
-        task_ids = {task.task_id for task in tasks}
+        seen: Set[Tuple[str, str]] = set()
         
-        for node in ast.walk(tree):
-            # Look for assignments: var = TaskType(...)
-            if isinstance(node, ast.Assign):
-                if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
-                    target_id = node.targets[0].id
-                    
-                    # Only process if this is a known task
-                    if target_id not in task_ids:
-                        continue
+        for node in assigns:
+            target_id = cast(ast.Name, node.targets[0]).id
+            
+            # Only process if this is a known task
+            if target_id not in task_ids:
+                continue
+            
+            # Extract dependencies from keyword arguments
+            for keyword in cast(ast.Call, node.value).keywords:
+                if keyword.arg in _IMPLICIT_KWARGS:
+                    source_ids = self._extract_task_references(keyword.value)
                     
-                    # Check if RHS is a task instantiation
-                    if isinstance(node.value, ast.Call):
-                        # Extract dependencies from keyword arguments
-                        for keyword in node.value.keywords:
-                            if keyword.arg in ("input_table", "input_paths"):
-                                source_ids = self._extract_task_references(keyword.value)
-                                
-                                for source_id in source_ids:
-                                    if source_id in task_ids:
-                                        edge = Edge(
-                                            source_id=source_id,
-                                            target_id=target_id,
-                                            edge_type="data_dependency"
-                                        )
-                                        if edge not in edges:
-                                            edges.append(edge)
-                                            self.logger.debug(f"Found implicit dependency: {source_id} -> {target_id}")
+                    for source_id in source_ids:
+                        if source_id in task_ids:
+                            if (source_id, target_id) not in seen:
+                                seen.add((source_id, target_id))
+                                edges.append(Edge(
+                                    source_id=source_id,
+                                    target_id=target_id,
+                                    edge_type="data_dependency"
+                                ))
+                                if self._debug:
+                                    self.logger.debug("Found implicit dependency: %s -> %s", source_id, target_id)
         
         return edges
     
@@ -1,20 +1,38 @@
 """BMF Flow Visualizer - YAML Parser for Configuration Files"""
 
 import ast
+import logging
+import os
+import pickle
+import stat
 import sys
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Set, Union
 from dataclasses import dataclass, field
 
 import yaml
 
+from src.parsers import _ast_cache
+from src.utils.compat import DATACLASS_SLOTS
 from src.utils.logger import FlowVisualizerLogger
+from src.utils.parallel import map_in_processes
 
 
-# Custom YAML Loader that handles unknown tags
-class CustomYAMLLoader(yaml.SafeLoader):
+# Prefer the libyaml-backed loader; the pure-Python one is several times slower
+_BaseSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # no CSafeLoader without libyaml
+
+
+# Custom YAML Loader that handles unknown tags (the base is only known at runtime)
+class CustomYAMLLoader(_BaseSafeLoader):  # type: ignore[misc,valid-type]
     """YAML loader that gracefully handles custom tags."""
-    pass
+    
+    def construct_yaml_str(self, node):
+        # Keys, operators and column names repeat throughout rule files;
+        # interning makes each distinct string a single shared object
+        return sys.intern(super().construct_yaml_str(node))
 
 
 def custom_tag_constructor(loader, tag_suffix, node):
@@ -30,9 +48,38 @@ def custom_tag_constructor(loader, tag_suffix, node):
 
 # Register multi-constructor for all unknown tags
 CustomYAMLLoader.add_multi_constructor('', custom_tag_constructor)
+CustomYAMLLoader.add_constructor('tag:yaml.org,2002:str', CustomYAMLLoader.construct_yaml_str)
+
+
+# Process-wide cache of loaded YAML documents: (absolute path, mtime_ns, size)
+# -> pickled data. Each hit unpickles a private copy, which is far cheaper than
+# re-running the YAML loader and keeps callers from sharing mutable state.
+_YAML_CACHE_SIZE = 512
+_yaml_cache: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_yaml_cache_lock = threading.Lock()
+
+# Below this many uncached files, worker start-up costs more than it saves
+_PARALLEL_YAML_MIN_FILES = 8
 
+# FilterCriteria fields read from the criteria definition, per criteria type:
+# (key, default) pairs; other types keep only the common fields
+_CRITERIA_FIELDS: Dict[str, Tuple[Tuple[str, Any], ...]] = {
+    'comparison': (('field', None), ('operator', None), ('value', None)),
+    'is_unique': (('keep', 'first'), ('subset', None)),
+    'is_null': (('field', None), ('negate', False)),
+    'is_empty': (('field', None), ('negate', False)),
+}
 
-@dataclass
+# Top-level keys identifying a dict-based YAML file, checked in priority order
+_FILE_TYPE_KEYS: Tuple[Tuple[str, str], ...] = (
+    ('merging_rules', 'merge'),
+    ('filter', 'filter'),
+    ('filters', 'filter'),
+    ('mapping_rules', 'mapping'),
+)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class MergeRule:
     """Represents a merge operation in merging rules."""
     table: str
@@ -56,7 +103,7 @@ class MergeRule:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class FilterCriteria:
     """Represents a single filter criterion."""
     criteria_type: str  # comparison, is_unique, is_null, is_empty, custom
@@ -84,7 +131,7 @@ class FilterCriteria:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class MappingRule:
     """Represents a mapping rule."""
     rule_id: str
@@ -112,7 +159,7 @@ class MappingRule:
         }
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class YAMLAnalysis:
     """Complete analysis of YAML files for a flow."""
     file_path: Path
@@ -120,7 +167,7 @@ class YAMLAnalysis:
     merge_rules: List[MergeRule] = field(default_factory=list)
     filter_criteria: List[FilterCriteria] = field(default_factory=list)
     mapping_rules: List[MappingRule] = field(default_factory=list)
-    raw_data: Dict[str, Any] = field(default_factory=dict)
+    raw_data: Dict[str, Any] = field(default_factory=dict)  # empty unless include_raw
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
 
@@ -135,37 +182,105 @@ class YAMLParser:
     - Mapping rules (mapping/*.yml)
     """
     
-    def __init__(self, yaml_path: str):
+    def __init__(self, yaml_path: str, include_raw: bool = False):
         """
         Initialize YAML parser.
         
         Args:
             yaml_path: Path to YAML file
+            include_raw: Keep the loaded document in YAMLAnalysis.raw_data
         """
         self.yaml_path = Path(yaml_path)
+        self.include_raw = include_raw
         self.logger = FlowVisualizerLogger.get_logger()
         
-        self._validate_file()
-        self._read_file()
+        self._stat_file()
     
-    def _validate_file(self):
-        """Validate that file exists and is readable."""
-        if not self.yaml_path.exists():
+    @classmethod
+    def from_string(
+        cls, text: str, yaml_path: str = "<string>", include_raw: bool = False
+    ) -> "YAMLParser":
+        """
+        Create a parser for YAML text that is already in memory.
+        
+        Args:
+            text: YAML document(s)
+            yaml_path: Name reported as the analysis file_path
+            include_raw: Keep the loaded document in YAMLAnalysis.raw_data
+        """
+        parser = cls.__new__(cls)
+        parser.yaml_path = Path(yaml_path)
+        parser.include_raw = include_raw
+        parser.logger = FlowVisualizerLogger.get_logger()
+        # No file version to key the document cache on
+        parser._cache_key = None
+        parser._raw_content = text
+        return parser
+    
+    def _stat_file(self):
+        """Validate that the file is a readable YAML file and record its version."""
+        # stat() rather than open(): a FIFO would block open() until a writer
+        # appears, and the contents are only read when needed
+        try:
+            st = os.stat(self.yaml_path)
+        except (FileNotFoundError, NotADirectoryError):
             raise FileNotFoundError(f"YAML file not found: {self.yaml_path}")
+        except OSError as e:
+            raise IOError(f"Failed to read file: {e}")
         
-        if not self.yaml_path.is_file():
+        if not stat.S_ISREG(st.st_mode):
             raise FileNotFoundError(f"Path is not a file: {self.yaml_path}")
         
         if not self.yaml_path.suffix in ['.yml', '.yaml']:
             raise ValueError(f"File must be .yml or .yaml file: {self.yaml_path}")
+        
+        self._cache_key: Optional[Tuple[str, int, int]] = self._version_key(st)
+        self._raw_content: Optional[str] = None
     
-    def _read_file(self):
-        """Read and store YAML file contents."""
-        try:
-            with open(self.yaml_path, 'r', encoding='utf-8') as f:
-                self.raw_content = f.read()
-        except IOError as e:
-            raise IOError(f"Failed to read file: {e}")
+    def _version_key(self, st: os.stat_result) -> Tuple[str, int, int]:
+        return (os.path.abspath(self.yaml_path), st.st_mtime_ns, st.st_size)
+    
+    @property
+    def raw_content(self) -> str:
+        """YAML file contents, read on first access."""
+        if self._raw_content is None:
+            try:
+                with open(self.yaml_path, 'r', encoding='utf-8') as f:
+                    self._raw_content = f.read()
+            except IOError as e:
+                raise IOError(f"Failed to read file: {e}")
+        return self._raw_content
+    
+    def _load_data(self) -> Any:
+        """Load the YAML document, reusing an earlier load of the same file version."""
+        key = self._cache_key
+        if key is None:
+            # In-memory text (from_string): nothing to reuse across parsers
+            return yaml.load(self._raw_content, Loader=CustomYAMLLoader)
+        
+        with _yaml_cache_lock:
+            cached = _yaml_cache.get(key)
+            if cached is not None:
+                _yaml_cache.move_to_end(key)
+        if cached is not None:
+            return pickle.loads(cached)
+        
+        # Parse YAML using custom loader that handles unknown tags, streaming
+        # from the file unless its contents were already read. The loader is
+        # given bytes and decodes them itself (UTF-8, or UTF-16 with a BOM).
+        if self._raw_content is not None:
+            data = yaml.load(self._raw_content, Loader=CustomYAMLLoader)
+        else:
+            with open(self.yaml_path, 'rb') as f:
+                data = yaml.load(f, Loader=CustomYAMLLoader)
+                # Key the entry on the version actually loaded
+                key = self._version_key(os.fstat(f.fileno()))
+        
+        with _yaml_cache_lock:
+            _yaml_cache[key] = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            while len(_yaml_cache) > _YAML_CACHE_SIZE:
+                _yaml_cache.popitem(last=False)
+        return data
     
     def _determine_file_type(self, data: Any) -> str:
         """Determine the type of YAML file based on content."""
@@ -178,12 +293,9 @@ class YAMLParser:
         
         # Handle dict-based YAML
         if isinstance(data, dict):
-            if 'merging_rules' in data:
-                return 'merge'
-            elif 'filter' in data or 'filters' in data:
-                return 'filter'
-            elif 'mapping_rules' in data:
-                return 'mapping'
+            for key, file_type in _FILE_TYPE_KEYS:
+                if key in data:
+                    return file_type
         
         return 'unknown'
     
@@ -199,35 +311,7 @@ class YAMLParser:
         analysis = YAMLAnalysis(file_path=self.yaml_path, file_type='unknown')
         
         try:
-            # Parse YAML using custom loader that handles unknown tags
-            data = yaml.load(self.raw_content, Loader=CustomYAMLLoader)
-            
-            if data is None:
-                analysis.warnings.append("YAML file is empty")
-                return analysis
-            
-            analysis.raw_data = data if isinstance(data, dict) else {}
-            
-            # Determine file type
-            analysis.file_type = self._determine_file_type(data)
-            self.logger.debug(f"Detected YAML file type: {analysis.file_type}")
-            
-            # Parse based on file type
-            if analysis.file_type == 'merge':
-                self._parse_merge_rules(data, analysis)
-            elif analysis.file_type == 'filter':
-                self._parse_filter_criteria(data, analysis)
-            elif analysis.file_type == 'mapping':
-                self._parse_mapping_rules(data, analysis)
-            else:
-                analysis.warnings.append(f"Unknown YAML file type: {self.yaml_path.name}")
-            
-            self.logger.info(
-                f"Extracted {len(analysis.merge_rules)} merge rules, "
-                f"{len(analysis.filter_criteria)} filters, "
-                f"{len(analysis.mapping_rules)} mappings"
-            )
-            
+            self._extract(self._load_data(), analysis)
         except yaml.YAMLError as e:
             analysis.errors.append(f"YAML parse error: {e}")
             self.logger.error(f"YAML parse error: {e}")
@@ -237,6 +321,70 @@ class YAMLParser:
         
         return analysis
     
+    def parse_documents(self) -> List[YAMLAnalysis]:
+        """
+        Parse every document of a multi-document (``---`` separated) YAML file.
+        
+        All documents are read by one loader in a single pass over the file.
+        
+        Returns:
+            One YAMLAnalysis per document, in file order; if loading fails,
+            the list ends with an analysis carrying the error
+        """
+        self.logger.info(f"Parsing YAML documents: {self.yaml_path}")
+        
+        analyses: List[YAMLAnalysis] = []
+        try:
+            with (nullcontext(self._raw_content) if self._cache_key is None
+                  else open(self.yaml_path, 'rb')) as source:
+                for data in yaml.load_all(source, Loader=CustomYAMLLoader):
+                    analysis = YAMLAnalysis(file_path=self.yaml_path, file_type='unknown')
+                    self._extract(data, analysis)
+                    analyses.append(analysis)
+        except yaml.YAMLError as e:
+            analysis = YAMLAnalysis(file_path=self.yaml_path, file_type='unknown')
+            analysis.errors.append(f"YAML parse error: {e}")
+            self.logger.error(f"YAML parse error: {e}")
+            analyses.append(analysis)
+        except Exception as e:
+            analysis = YAMLAnalysis(file_path=self.yaml_path, file_type='unknown')
+            analysis.errors.append(f"Unexpected error during YAML parsing: {e}")
+            self.logger.error(f"Unexpected error: {e}")
+            analyses.append(analysis)
+        
+        return analyses
+    
+    def _extract(self, data: Any, analysis: YAMLAnalysis):
+        """Fill analysis with the rules found in one loaded YAML document."""
+        if data is None:
+            analysis.warnings.append("YAML file is empty")
+            return
+        
+        # The extracted rules are what callers use; the document is only
+        # retained on request
+        if self.include_raw and isinstance(data, dict):
+            analysis.raw_data = data
+        
+        # Determine file type
+        analysis.file_type = self._determine_file_type(data)
+        self.logger.debug(f"Detected YAML file type: {analysis.file_type}")
+        
+        # Parse based on file type
+        if analysis.file_type == 'merge':
+            self._parse_merge_rules(data, analysis)
+        elif analysis.file_type == 'filter':
+            self._parse_filter_criteria(data, analysis)
+        elif analysis.file_type == 'mapping':
+            self._parse_mapping_rules(data, analysis)
+        else:
+            analysis.warnings.append(f"Unknown YAML file type: {self.yaml_path.name}")
+        
+        self.logger.info(
+            f"Extracted {len(analysis.merge_rules)} merge rules, "
+            f"{len(analysis.filter_criteria)} filters, "
+            f"{len(analysis.mapping_rules)} mappings"
+        )
+    
     def _parse_merge_rules(self, data: Dict[str, Any], analysis: YAMLAnalysis):
         """Parse merge rules from YAML data."""
         merge_rules_data = data.get('merging_rules', [])
@@ -245,6 +393,7 @@ class YAMLParser:
             analysis.errors.append("merging_rules must be a list")
             return
         
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         for idx, rule_data in enumerate(merge_rules_data):
             try:
                 # Handle simple table reference
@@ -272,7 +421,8 @@ class YAMLParser:
                     )
                     
                     analysis.merge_rules.append(rule)
-                    self.logger.debug(f"Extracted merge rule: {table_name}")
+                    if debug:
+                        self.logger.debug("Extracted merge rule: %s", table_name)
                     
             except Exception as e:
                 analysis.warnings.append(f"Failed to parse merge rule {idx}: {e}")
@@ -290,6 +440,7 @@ class YAMLParser:
             analysis.errors.append("Filter rules must be a list")
             return
         
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         for idx, filter_data in enumerate(filter_list):
             try:
                 if not isinstance(filter_data, dict):
@@ -306,49 +457,18 @@ class YAMLParser:
                 if isinstance(criteria_def, dict):
                     criteria_type = criteria_def.get('criteria', 'unknown')
                     
-                    # Create appropriate filter criterion based on type
-                    if criteria_type == 'comparison':
-                        criterion = FilterCriteria(
-                            criteria_type='comparison',
-                            criteria_id=criteria_id,
-                            field=criteria_def.get('field'),
-                            operator=criteria_def.get('operator'),
-                            value=criteria_def.get('value'),
-                            description=description,
-                        )
-                    elif criteria_type == 'is_unique':
-                        criterion = FilterCriteria(
-                            criteria_type='is_unique',
-                            criteria_id=criteria_id,
-                            keep=criteria_def.get('keep', 'first'),
-                            subset=criteria_def.get('subset'),
-                            description=description,
-                        )
-                    elif criteria_type == 'is_null':
-                        criterion = FilterCriteria(
-                            criteria_type='is_null',
-                            criteria_id=criteria_id,
-                            field=criteria_def.get('field'),
-                            negate=criteria_def.get('negate', False),
-                            description=description,
-                        )
-                    elif criteria_type == 'is_empty':
-                        criterion = FilterCriteria(
-                            criteria_type='is_empty',
-                            criteria_id=criteria_id,
-                            field=criteria_def.get('field'),
-                            negate=criteria_def.get('negate', False),
-                            description=description,
-                        )
-                    else:
-                        criterion = FilterCriteria(
-                            criteria_type=criteria_type,
-                            criteria_id=criteria_id,
-                            description=description,
-                        )
+                    # Type-specific fields come from the criteria table
+                    extra_fields = _CRITERIA_FIELDS.get(criteria_type, ()) if isinstance(criteria_type, str) else ()
+                    criterion = FilterCriteria(
+                        criteria_type=criteria_type,
+                        criteria_id=criteria_id,
+                        description=description,
+                        **{key: criteria_def.get(key, default) for key, default in extra_fields},
+                    )
                     
                     analysis.filter_criteria.append(criterion)
-                    self.logger.debug(f"Extracted filter criterion: {criteria_id}")
+                    if debug:
+                        self.logger.debug("Extracted filter criterion: %s", criteria_id)
                     
             except Exception as e:
                 analysis.warnings.append(f"Failed to parse filter {idx}: {e}")
@@ -362,41 +482,128 @@ class YAMLParser:
             analysis.errors.append("mapping_rules must be a list")
             return
         
+        debug = self.logger.isEnabledFor(logging.DEBUG)
         for idx, rule_data in enumerate(mapping_rules_data):
             try:
                 if not isinstance(rule_data, dict):
                     analysis.warnings.append(f"Mapping rule {idx} is not a dictionary")
                     continue
                 
+                get = rule_data.get
                 rule = MappingRule(
-                    rule_id=rule_data.get('id', f'mapping_{idx}'),
-                    description=rule_data.get('description', ''),
-                    action=rule_data.get('action', 'unknown'),
-                    value=rule_data.get('value'),
-                    target=rule_data.get('target'),
-                    overwrite=rule_data.get('overwrite', False),
-                    object=rule_data.get('object'),
-                    source=rule_data.get('source'),
-                    comment=rule_data.get('comment', ''),
+                    rule_id=get('id', f'mapping_{idx}'),
+                    description=get('description', ''),
+                    action=get('action', 'unknown'),
+                    value=get('value'),
+                    target=get('target'),
+                    overwrite=get('overwrite', False),
+                    object=get('object'),
+                    source=get('source'),
+                    comment=get('comment', ''),
                 )
                 
                 analysis.mapping_rules.append(rule)
-                self.logger.debug(f"Extracted mapping rule: {rule.rule_id}")
+                if debug:
+                    self.logger.debug("Extracted mapping rule: %s", rule.rule_id)
                 
             except Exception as e:
                 analysis.warnings.append(f"Failed to parse mapping rule {idx}: {e}")
                 self.logger.warning(f"Failed to parse mapping rule {idx}: {e}")
 
 
-def parse_yaml_file(yaml_path: str) -> YAMLAnalysis:
+def parse_yaml_file(yaml_path: str, include_raw: bool = False) -> YAMLAnalysis:
     """
     Convenience function to parse a YAML file.
     
     Args:
         yaml_path: Path to YAML file
+        include_raw: Keep the loaded document in YAMLAnalysis.raw_data
         
     Returns:
         YAMLAnalysis object
     """
-    parser = YAMLParser(yaml_path)
+    parser = YAMLParser(yaml_path, include_raw=include_raw)
     return parser.parse()
+
+
+def parse_yaml_stream(yaml_path: str, include_raw: bool = False) -> List[YAMLAnalysis]:
+    """
+    Convenience function to parse every document of a multi-document YAML file.
+    
+    Args:
+        yaml_path: Path to YAML file
+        include_raw: Keep each loaded document in YAMLAnalysis.raw_data
+        
+    Returns:
+        One YAMLAnalysis per document
+    """
+    return YAMLParser(yaml_path, include_raw=include_raw).parse_documents()
+
+
+def parse_yaml_batch(
+    yaml_paths: Sequence[Union[str, Path]], workers: Optional[int] = None
+) -> List[Union[YAMLAnalysis, Exception]]:
+    """
+    Parse several YAML files, serving unchanged ones from the on-disk parse cache.
+    
+    Files missing from the cache are parsed across processes when worthwhile.
+    Set BMF_FLOW_VIZ_NO_CACHE to always parse.
+    
+    Args:
+        yaml_paths: Paths to YAML files
+        workers: Worker process count (defaults to the CPU count)
+        
+    Returns:
+        One YAMLAnalysis per path, in input order, or the exception parsing it raised
+    """
+    outcomes: Dict[int, Union[YAMLAnalysis, Exception]] = {}
+    keys: Dict[int, str] = {}
+    misses: List[int] = []
+    
+    for index, yaml_path in enumerate(yaml_paths):
+        try:
+            # Only regular files are hashed; YAMLParser rejects anything else
+            # without opening it (a FIFO would block)
+            if not stat.S_ISREG(os.stat(yaml_path).st_mode):
+                misses.append(index)
+                continue
+            with open(yaml_path, 'rb') as f:
+                key = _ast_cache.make_key("yaml", str(yaml_path), f.read())
+        except OSError as e:
+            outcomes[index] = e
+            continue
+        analysis = _ast_cache.load(key)
+        if analysis is not None:
+            outcomes[index] = analysis
+        else:
+            keys[index] = key
+            misses.append(index)
+    
+    parsed = map_in_processes(
+        parse_yaml_file, [str(yaml_paths[index]) for index in misses], _PARALLEL_YAML_MIN_FILES, workers
+    )
+    for index, analysis in zip(misses, parsed):
+        outcomes[index] = analysis
+        if index in keys and isinstance(analysis, YAMLAnalysis) and not analysis.errors:
+            _ast_cache.store(keys[index], analysis)
+    
+    return [outcomes[index] for index in range(len(yaml_paths))]
+
+
+def parse_yaml_files(yaml_paths: List[str], workers: Optional[int] = None) -> List[YAMLAnalysis]:
+    """
+    Parse several YAML files, from the parse cache or across processes when worthwhile.
+    
+    Args:
+        yaml_paths: Paths to YAML files
+        workers: Worker process count (defaults to the CPU count)
+        
+    Returns:
+        One YAMLAnalysis per path, in input order
+    """
+    analyses = []
+    for outcome in parse_yaml_batch(yaml_paths, workers):
+        if isinstance(outcome, Exception):
+            raise outcome
+        analyses.append(outcome)
+    return analyses
@@ -1,8 +1,12 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 import re
 
 from src.models.task import Task, Edge, FlowGraph
-from src.config.loader import ConfigLoader
+from src.config import loader as config
+
+
+# Most emoji codepoints, stripped from labels in png_safe mode
+_EMOJI_RE = re.compile(r"[\U0001F300-\U0001FFFF]")
 
 
 class MermaidGenerator:
@@ -16,12 +20,21 @@ class MermaidGenerator:
 
     def __init__(self, direction: Optional[str] = None, color_scheme: str = "default", hide_utility_tasks: bool = False):
         # Direction: TD (top-down), LR (left-right), BT (bottom-top)
-        self.config = ConfigLoader.get_instance()
-        default_dir = self.config.get_default_styling().get("diagram_direction", "TD")
+        default_dir = config.get_default_styling().get("diagram_direction", "TD")
         self.direction = direction or default_dir
         self.color_scheme = color_scheme
         self.hide_utility_tasks = hide_utility_tasks
 
+    def set_scheme(self, color_scheme: str) -> "MermaidGenerator":
+        """Switch the color scheme without re-running __init__ setup."""
+        self.color_scheme = color_scheme
+        return self
+
+    def set_hide_utility(self, hide_utility_tasks: bool) -> "MermaidGenerator":
+        """Toggle hiding of utility tasks without re-running __init__ setup."""
+        self.hide_utility_tasks = hide_utility_tasks
+        return self
+
     def generate(self, graph: FlowGraph, title: Optional[str] = None, label_edges: bool = False, show_params: bool = True, png_safe: bool = False) -> str:
         lines: List[str] = []
         lines.append(f"graph {self.direction}")
@@ -33,21 +46,32 @@ class MermaidGenerator:
         # Filter utility tasks if requested
         visible_tasks = self._get_visible_tasks(graph)
         
-        # Nodes
+        # Nodes, plus their styling via classDef/class based on task
+        # categories/colors, in one pass over the visible tasks
+        # Keep styles for both .mmd and PNG so themes are consistent
+        cats: Dict[str, str] = {}
+        class_assignments: List[str] = []
+        styles: Dict[str, Tuple[str, str]] = {}  # task_type -> (category, color)
         for task_id in visible_tasks:
             task = graph.tasks[task_id]
             lines.append(self._render_node(task, show_params, png_safe))
+            style = styles.get(task.task_type)
+            if style is None:
+                style = styles[task.task_type] = (
+                    config.get_task_category(task.task_type),
+                    config.get_task_color(task.task_type, self.color_scheme),
+                )
+            cat, color = style
+            cats[cat] = color
+            class_assignments.append(f"class {task.task_id} {cat};")
 
         # Edges (with utility task bypass)
         edges_to_render = self._get_visible_edges(graph, visible_tasks)
         for edge in edges_to_render:
             lines.append(self._render_edge(edge, graph, use_task_type_labels=label_edges))
 
-        # Styling via classDef/class based on task categories/colors
-        # Keep styles for both .mmd and PNG so themes are consistent
-        # Only style visible tasks
-        class_defs, class_assignments = self._render_styles(graph, visible_tasks)
-        lines.extend(class_defs)
+        for cat, color in cats.items():
+            lines.append(f"classDef {cat} fill:{color},stroke:#333,stroke-width:1px;")
         lines.extend(class_assignments)
         
         # Add arrow styling for dark mode
@@ -59,7 +83,7 @@ class MermaidGenerator:
 
     def _render_node(self, task: Task, show_params: bool = True, png_safe: bool = False) -> str:
         # Build label with task name and optional details
-        task_def = self.config.get_task_def(task.task_type) or {}
+        task_def = config.get_task_def(task.task_type) or {}
         icon = task_def.get("icon", "")
         name = task.get_display_label()
 
@@ -78,7 +102,7 @@ class MermaidGenerator:
             # Sanitize for mmdc fallback: strip emojis/HTML and simplify
             clean = self._strip_emojis(label)
             clean = clean.replace("<br/>", " ").replace("\n", " ")
-            clean = re.sub(r"\s+", " ", clean).strip()
+            clean = " ".join(clean.split())  # collapse and trim whitespace
             safe_label = clean.replace("\"", "'")
             shape = "rect"
         else:
@@ -97,8 +121,7 @@ class MermaidGenerator:
             if src:
                 if use_task_type_labels:
                     # Show simple task type display name
-                    task_def = self.config.get_task_def(src.task_type) or {}
-                    label = task_def.get("display_name", src.task_type)
+                    label = config.get_task_display_name(src.task_type)
                 else:
                     # No labels at all
                     label = ""
@@ -137,27 +160,7 @@ class MermaidGenerator:
             return "Aggregate"
         
         # Default to display name
-        task_def = self.config.get_task_def(t) or {}
-        return task_def.get("display_name", t)
-
-    def _render_styles(self, graph: FlowGraph, visible_tasks: Optional[List[str]] = None):
-        # Collect categories used and their colors (only for visible tasks)
-        tasks_to_style = visible_tasks if visible_tasks is not None else list(graph.tasks.keys())
-        cats = {}
-        for task_id in tasks_to_style:
-            task = graph.tasks[task_id]
-            cat = self.config.get_task_category(task.task_type)
-            color = self.config.get_task_color(task.task_type, self.color_scheme)
-            cats[cat] = color
-        class_defs = []
-        for cat, color in cats.items():
-            class_defs.append(f"classDef {cat} fill:{color},stroke:#333,stroke-width:1px;")
-        class_assignments = []
-        for task_id in tasks_to_style:
-            task = graph.tasks[task_id]
-            cat = self.config.get_task_category(task.task_type)
-            class_assignments.append(f"class {task.task_id} {cat};")
-        return class_defs, class_assignments
+        return config.get_task_display_name(t)
 
     def _get_task_details(self, task: Task) -> str:
         """Extract detailed information about task operation for node labels."""
@@ -200,7 +203,7 @@ class MermaidGenerator:
 
     def _shape_for_task(self, task: Task) -> str:
         # Prefer config-defined shape; fallback to category mapping (handled in loader)
-        return self.config.get_task_shape(task.task_type)
+        return config.get_task_shape(task.task_type)
 
     def _node_shape_syntax(self, node_id: str, label: str, shape: str, png_safe: bool = False) -> str:
         # Map semantic shape to Mermaid syntax
@@ -227,69 +230,81 @@ class MermaidGenerator:
                 visible.append(task_id)
         return visible
     
-    def _get_visible_edges(self, graph: FlowGraph, visible_tasks: List[str]) -> List[Edge]:
+    def _get_visible_edges(self, graph: FlowGraph, visible_tasks: List[str]) -> Sequence[Edge]:
         """Generate edges, bypassing hidden utility tasks."""
         if not self.hide_utility_tasks:
             return graph.edges
         
         visible_set = set(visible_tasks)
-        new_edges = []
+        # Adjacency in edge order, built once for all bypass searches
+        preds: Dict[str, List[str]] = {}
+        succs: Dict[str, List[str]] = {}
+        for edge in graph.edges:
+            preds.setdefault(edge.target_id, []).append(edge.source_id)
+            succs.setdefault(edge.source_id, []).append(edge.target_id)
+        upstream_of: Dict[str, List[str]] = {}
+        downstream_of: Dict[str, List[str]] = {}
         
+        unique_edges: List[Edge] = []
+        seen: Set[Tuple[str, str]] = set()
         for edge in graph.edges:
             src_visible = edge.source_id in visible_set
             tgt_visible = edge.target_id in visible_set
             
             if src_visible and tgt_visible:
                 # Both visible, keep edge as-is
-                new_edges.append(edge)
-            elif not src_visible and tgt_visible:
+                if (edge.source_id, edge.target_id) not in seen:
+                    seen.add((edge.source_id, edge.target_id))
+                    unique_edges.append(edge)
+                continue
+            
+            if tgt_visible:
                 # Source hidden, find upstream visible tasks
-                upstream = self._find_upstream_visible(graph, edge.source_id, visible_set)
-                for up_id in upstream:
-                    new_edges.append(Edge(source_id=up_id, target_id=edge.target_id, label=edge.label))
-            elif src_visible and not tgt_visible:
+                upstream = upstream_of.get(edge.source_id)
+                if upstream is None:
+                    upstream = upstream_of[edge.source_id] = self._find_visible(preds, edge.source_id, visible_set)
+                pairs = [(up_id, edge.target_id) for up_id in upstream]
+            elif src_visible:
                 # Target hidden, find downstream visible tasks
-                downstream = self._find_downstream_visible(graph, edge.target_id, visible_set)
-                for down_id in downstream:
-                    new_edges.append(Edge(source_id=edge.source_id, target_id=down_id, label=edge.label))
-            # If both hidden, skip edge entirely
-        
-        # Remove duplicates
-        unique_edges = []
-        seen = set()
-        for edge in new_edges:
-            key = (edge.source_id, edge.target_id)
-            if key not in seen:
-                seen.add(key)
-                unique_edges.append(edge)
+                downstream = downstream_of.get(edge.target_id)
+                if downstream is None:
+                    downstream = downstream_of[edge.target_id] = self._find_visible(succs, edge.target_id, visible_set)
+                pairs = [(edge.source_id, down_id) for down_id in downstream]
+            else:
+                # If both hidden, skip edge entirely
+                continue
+            
+            for key in pairs:
+                if key not in seen:
+                    seen.add(key)
+                    unique_edges.append(Edge(source_id=key[0], target_id=key[1], label=edge.label))
         
         return unique_edges
     
-    def _find_upstream_visible(self, graph: FlowGraph, task_id: str, visible_set: set) -> List[str]:
-        """Find upstream visible tasks, traversing through hidden tasks."""
-        upstream = []
-        for edge in graph.edges:
-            if edge.target_id == task_id:
-                if edge.source_id in visible_set:
-                    upstream.append(edge.source_id)
-                else:
-                    # Recurse through hidden task
-                    upstream.extend(self._find_upstream_visible(graph, edge.source_id, visible_set))
-        return upstream
-    
-    def _find_downstream_visible(self, graph: FlowGraph, task_id: str, visible_set: set) -> List[str]:
-        """Find downstream visible tasks, traversing through hidden tasks."""
-        downstream = []
-        for edge in graph.edges:
-            if edge.source_id == task_id:
-                if edge.target_id in visible_set:
-                    downstream.append(edge.target_id)
-                else:
-                    # Recurse through hidden task
-                    downstream.extend(self._find_downstream_visible(graph, edge.target_id, visible_set))
-        return downstream
+    @staticmethod
+    def _find_visible(adjacency: Dict[str, List[str]], task_id: str, visible_set: Set[str]) -> List[str]:
+        """
+        Find the visible tasks reached from a hidden task through hidden tasks only.
+        
+        Iterative depth-first search in edge order; each hidden task is expanded
+        once, so hidden cycles terminate.
+        """
+        found: List[str] = []
+        expanded = {task_id}
+        stack = [iter(adjacency.get(task_id, ()))]
+        while stack:
+            for neighbour in stack[-1]:
+                if neighbour in visible_set:
+                    found.append(neighbour)
+                elif neighbour not in expanded:
+                    expanded.add(neighbour)
+                    stack.append(iter(adjacency.get(neighbour, ())))
+                    break
+            else:
+                stack.pop()
+        return found
 
     @staticmethod
     def _strip_emojis(text: str) -> str:
         # Remove most emoji codepoints
-        return re.sub(r"[\U0001F300-\U0001FFFF]", "", text)
+        return _EMOJI_RE.sub("", text)
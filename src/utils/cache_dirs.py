@@ -0,0 +1,39 @@
+"""BMF Flow Visualizer - Per-user Cache Directories"""
+
+import os
+import stat
+from pathlib import Path
+from typing import Optional
+
+
+def user_cache_dir(name: str) -> Path:
+    """Cache location: $XDG_CACHE_HOME/bmf_flow_viz/<name> (default ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "bmf_flow_viz" / name
+
+
+def private_cache_dir(name: str) -> Optional[Path]:
+    """
+    Create user_cache_dir(name) readable only by the current user.
+
+    Returns:
+        The directory, or None if it can't be created, isn't a real
+        directory, is owned by another user or is writable by others -
+        callers then skip caching
+    """
+    path = user_cache_dir(name)
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(path)
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        # No ownership on Windows; elsewhere refuse a directory planted or
+        # writable by someone else, since its entries can't be trusted
+        if hasattr(os, "getuid"):
+            if st.st_uid != os.getuid() or st.st_mode & 0o022:
+                return None
+            if st.st_mode & 0o077:
+                os.chmod(path, 0o700)
+    except OSError:
+        return None
+    return path
@@ -0,0 +1,9 @@
+"""BMF Flow Visualizer - Python Version Compatibility"""
+
+import sys
+from typing import Any, Dict
+
+
+# Slotted dataclasses drop the per-instance __dict__ (Python 3.10+);
+# use as @dataclass(**DATACLASS_SLOTS)
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -28,24 +28,35 @@ class FlowVisualizerLogger:
         return cls._logger
     
     @classmethod
-    def debug(cls, message: str):
-        """Log debug message."""
-        cls.get_logger().debug(message)
+    def debug(cls, message: str, *args):
+        """
+        Log debug message.
+        
+        Pass %-style arguments rather than an f-string so the message is
+        only formatted when debug logging is enabled:
+        FlowVisualizerLogger.debug("parsed %d tasks", n)
+        """
+        cls.get_logger().debug(message, *args)
     
     @classmethod
-    def info(cls, message: str):
+    def info(cls, message: str, *args):
         """Log info message."""
-        cls.get_logger().info(message)
+        cls.get_logger().info(message, *args)
     
     @classmethod
-    def warning(cls, message: str):
+    def warning(cls, message: str, *args):
         """Log warning message."""
-        cls.get_logger().warning(message)
+        cls.get_logger().warning(message, *args)
     
     @classmethod
-    def error(cls, message: str):
+    def error(cls, message: str, *args):
         """Log error message."""
-        cls.get_logger().error(message)
+        cls.get_logger().error(message, *args)
+    
+    @classmethod
+    def is_enabled_for(cls, level: int) -> bool:
+        """Check whether messages at level would be logged; guard debug-only work with it."""
+        return cls.get_logger().isEnabledFor(level)
     
     @classmethod
     def set_level(cls, level: int):
@@ -0,0 +1,54 @@
+"""BMF Flow Visualizer - Process Pool Helper"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import Callable, List, Optional, Sequence, TypeVar, Union
+
+from src.utils.logger import FlowVisualizerLogger
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _capture(func: Callable[[T], R], item: T) -> Union[R, Exception]:
+    """Run func(item) in a worker, handing back an exception instead of raising it."""
+    try:
+        return func(item)
+    except Exception as e:
+        return e
+
+
+def map_in_processes(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    min_items: int,
+    workers: Optional[int] = None,
+) -> List[Union[R, Exception]]:
+    """
+    Apply func to every item, across worker processes when there are enough items.
+
+    func must be a module-level function so workers can import it. If no
+    pool can be started (OSError, e.g. no semaphore support) or a worker
+    dies (BrokenProcessPool), every item is processed serially instead.
+
+    Args:
+        func: Function applied to each item independently
+        items: Inputs to func
+        min_items: Fewest items worth starting worker processes for
+        workers: Worker process count (defaults to the CPU count)
+
+    Returns:
+        One result per item, in input order, or the exception func raised for it
+    """
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers > 1 and len(items) >= min_items:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_capture, repeat(func), items, chunksize=4))
+        except (OSError, BrokenProcessPool) as e:
+            FlowVisualizerLogger.debug("Process pool unavailable, running serially: %s", e)
+
+    return [_capture(func, item) for item in items]
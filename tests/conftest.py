@@ -1,16 +1,66 @@
 """Pytest configuration and shared fixtures"""
 
+import os
+
 import pytest
 from pathlib import Path
 
 
-@pytest.fixture
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "integration: end-to-end tests over a whole object (deselect with -m 'not integration')"
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_home(tmp_path_factory):
+    """Point XDG_CACHE_HOME at a session temp dir so tests never write to the real user cache."""
+    cache_home = tmp_path_factory.mktemp("cache_home")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("XDG_CACHE_HOME", str(cache_home))
+        yield cache_home
+
+
+@pytest.fixture(scope="session")
 def test_object_path():
-    """Path to the test GxPD object."""
-    return Path("/Users/shormigo/Documents/BASE/Viatris/medicinal_product__rim_gxpd_all")
+    """
+    Path to the test GxPD object, taken from BMF_TEST_OBJECT_PATH.
+    
+    Tests depending on it are skipped when the variable is unset or the
+    directory is missing.
+    """
+    path = os.environ.get("BMF_TEST_OBJECT_PATH")
+    if not path or not Path(path).is_dir():
+        pytest.skip("GxPD test object not available (set BMF_TEST_OBJECT_PATH)")
+    return Path(path)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_object_path(test_object_path):
     """Valid object path fixture."""
     return str(test_object_path)
+
+
+@pytest.fixture(scope="session")
+def gxpd_analysis(valid_object_path):
+    """FlowAnalysis of the GxPD creation_flow.py, parsed once per session (treat as read-only)."""
+    from src.parsers.python_parser import ASTPythonParser
+    
+    flow_path = Path(valid_object_path) / "flows" / "creation_flow.py"
+    return ASTPythonParser(str(flow_path)).parse()
+
+
+@pytest.fixture(scope="session")
+def minimal_object_skeleton(tmp_path_factory):
+    """
+    Minimal valid object structure (required directories plus a stub
+    creation_flow.py), built once per session.
+    
+    Tests that only read it may point at it directly; tests that modify it
+    should shutil.copytree() it into their own tmp_path first.
+    """
+    base = tmp_path_factory.mktemp("test_object")
+    for dir_name in ("flows", "filter", "mapping", "merging_rules"):
+        (base / dir_name).mkdir()
+    (base / "flows" / "creation_flow.py").write_text("# Minimal flow\npass")
+    return base
@@ -0,0 +1,59 @@
+"""Unit tests for per-user cache directories"""
+
+import os
+import stat
+
+import pytest
+
+from src.utils.cache_dirs import private_cache_dir, user_cache_dir
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions only")
+class TestPrivateCacheDir:
+    """Tests for private_cache_dir."""
+    
+    def test_created_under_xdg_cache_home(self, tmp_path, monkeypatch):
+        """Test that the directory is created in XDG_CACHE_HOME, private to the user."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        
+        path = private_cache_dir("render")
+        
+        assert path == user_cache_dir("render") == tmp_path / "bmf_flow_viz" / "render"
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+    
+    def test_existing_directory_is_tightened(self, tmp_path, monkeypatch):
+        """Test that an existing directory readable by others is made private."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        path = tmp_path / "bmf_flow_viz" / "render"
+        path.mkdir(parents=True)
+        os.chmod(path, 0o755)
+        
+        assert private_cache_dir("render") == path
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+    
+    @pytest.mark.parametrize("mode", [0o770, 0o757], ids=["group", "world"])
+    def test_directory_writable_by_others_is_refused(self, tmp_path, monkeypatch, mode):
+        """Test that a group- or world-writable directory is not used."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        path = tmp_path / "bmf_flow_viz" / "render"
+        path.mkdir(parents=True)
+        os.chmod(path, mode)
+        
+        assert private_cache_dir("render") is None
+    
+    def test_directory_owned_by_another_user_is_refused(self, tmp_path, monkeypatch):
+        """Test that a directory owned by someone else is not used."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        owner = os.getuid()
+        monkeypatch.setattr(os, "getuid", lambda: owner + 1)
+        
+        assert private_cache_dir("render") is None
+    
+    def test_symlink_is_refused(self, tmp_path, monkeypatch):
+        """Test that a symlink planted in place of the directory is not used."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        (tmp_path / "elsewhere").mkdir()
+        (tmp_path / "bmf_flow_viz").mkdir()
+        (tmp_path / "bmf_flow_viz" / "render").symlink_to(tmp_path / "elsewhere")
+        
+        assert private_cache_dir("render") is None
@@ -1,16 +1,30 @@
 """Unit tests for file discovery module"""
 
+import os
+import shutil
+
 import pytest
 from pathlib import Path
 from src.discovery.file_locator import FileLocator, ObjectValidator
 
 
+@pytest.fixture(scope="module")
+def locator(valid_object_path):
+    """One FileLocator over the GxPD object, shared by the read-only tests."""
+    return FileLocator(valid_object_path)
+
+
+@pytest.fixture(scope="module")
+def validator(valid_object_path, locator):
+    """ObjectValidator over the GxPD object, reusing the shared locator."""
+    return ObjectValidator(valid_object_path, locator=locator)
+
+
 class TestFileLocator:
     """Tests for FileLocator class."""
     
-    def test_initialization_valid_path(self, valid_object_path):
+    def test_initialization_valid_path(self, locator, valid_object_path):
         """Test FileLocator initialization with valid path."""
-        locator = FileLocator(valid_object_path)
         assert locator.object_path == Path(valid_object_path)
     
     def test_initialization_invalid_path(self):
@@ -18,39 +32,48 @@ class TestFileLocator:
         with pytest.raises(FileNotFoundError):
             FileLocator("/non/existent/path")
     
-    def test_locate_creation_flow(self, valid_object_path):
+    def test_locate_creation_flow(self, locator):
         """Test locating creation_flow.py file."""
-        locator = FileLocator(valid_object_path)
         flow_path = locator.locate_creation_flow()
         
         assert flow_path.exists()
         assert flow_path.name == "creation_flow.py"
         assert flow_path.parent.name == "flows"
     
-    def test_locate_creation_flow_missing(self, tmp_path):
+    def test_locate_creation_flow_missing(self, tmp_path, minimal_object_skeleton):
         """Test locating creation_flow.py when it doesn't exist."""
-        # Create a minimal valid object structure without creation_flow.py
+        # Copy the minimal valid object structure and drop creation_flow.py
         obj_path = tmp_path / "test_object"
-        obj_path.mkdir()
-        (obj_path / "flows").mkdir()
-        (obj_path / "filter").mkdir()
-        (obj_path / "mapping").mkdir()
-        (obj_path / "merging_rules").mkdir()
+        shutil.copytree(minimal_object_skeleton, obj_path)
+        (obj_path / "flows" / "creation_flow.py").unlink()
         
         locator = FileLocator(str(obj_path))
         with pytest.raises(FileNotFoundError):
             locator.locate_creation_flow()
     
-    def test_get_object_name(self, valid_object_path):
+    def test_locate_creation_flow_created_later(self, tmp_path, minimal_object_skeleton):
+        """Test that a flow file created after a failed lookup is found by the same locator."""
+        obj_path = tmp_path / "test_object"
+        shutil.copytree(minimal_object_skeleton, obj_path)
+        flow_file = obj_path / "flows" / "creation_flow.py"
+        flow_file.unlink()
+        
+        locator = FileLocator(str(obj_path))
+        with pytest.raises(FileNotFoundError):
+            locator.locate_creation_flow()
+        
+        flow_file.write_text("# flow\n")
+        assert locator.locate_creation_flow() == flow_file
+        assert ObjectValidator(str(obj_path), locator=locator).validate()["valid"]
+    
+    def test_get_object_name(self, locator):
         """Test getting object name from path."""
-        locator = FileLocator(valid_object_path)
         name = locator.get_object_name()
         
         assert name == "medicinal_product__rim_gxpd_all"
     
-    def test_find_all_yaml_files(self, valid_object_path):
+    def test_find_all_yaml_files(self, locator):
         """Test finding all YAML files."""
-        locator = FileLocator(valid_object_path)
         yaml_files = locator.find_all_yaml_files()
         
         assert "filter" in yaml_files
@@ -62,32 +85,88 @@ class TestFileLocator:
         assert len(yaml_files["mapping"]) > 0
         assert len(yaml_files["merging_rules"]) > 0
     
-    def test_locate_yaml_file(self, valid_object_path):
+    def test_locate_yaml_file(self, locator):
         """Test locating a specific YAML file."""
-        locator = FileLocator(valid_object_path)
-        
         # Test with relative path
         yaml_path = locator.locate_yaml_file("filter/filtered_gxpd_export.yml")
         assert yaml_path is not None
         assert yaml_path.exists()
     
-    def test_get_structure_summary(self, valid_object_path):
+    def test_get_structure_summary(self, locator):
         """Test getting structure summary."""
-        locator = FileLocator(valid_object_path)
         summary = locator.get_structure_summary()
         
         assert summary["object_name"] == "medicinal_product__rim_gxpd_all"
         assert summary["creation_flow_exists"] is True
         assert summary["yaml_files_count"] > 0
         assert summary["python_files_count"] >= 2  # creation_flow.py and deletion_flow.py
+    
+    def test_top_level_entries(self, tmp_path):
+        """Test listing the object directory's entries and whether each is a directory."""
+        obj_path = tmp_path / "test_object"
+        (obj_path / "flows").mkdir(parents=True)
+        (obj_path / "notes.txt").write_text("x")
+        
+        locator = FileLocator(str(obj_path))
+        entries = locator.top_level_entries()
+        entries["flows"] = False
+        
+        assert locator.top_level_entries() == {"flows": True, "notes.txt": False}
+
+    
+    def test_locate_yaml_file_full_path_reference(self, tmp_path):
+        """Test resolving quoted and full_path()-wrapped YAML references."""
+        obj_path = tmp_path / "test_object"
+        (obj_path / "filter").mkdir(parents=True)
+        (obj_path / "filter" / "rules.yml").write_text("key: value\n")
+        
+        locator = FileLocator(str(obj_path))
+        expected = obj_path / "filter" / "rules.yml"
+        
+        assert locator.locate_yaml_file('full_path("migrations/test_object/filter/rules.yml")') == expected
+        assert locator.locate_yaml_file('"/filter/rules.yml"') == expected
+        assert locator.locate_yaml_file("'missing.yml'") is None
+
+    
+    def test_find_all_yaml_files_sees_new_files(self, tmp_path):
+        """Test that cached YAML listings are refreshed when a directory changes."""
+        obj_path = tmp_path / "test_object"
+        (obj_path / "filter").mkdir(parents=True)
+        (obj_path / "filter" / "a.yml").write_text("key: value\n")
+        
+        locator = FileLocator(str(obj_path))
+        assert len(locator.find_all_yaml_files()["filter"]) == 1
+        
+        (obj_path / "filter" / "b.yml").write_text("key: value\n")
+        assert len(locator.find_all_yaml_files()["filter"]) == 2
+        assert locator.get_structure_summary()["yaml_files_count"] == 2
+    
+    def test_get_structure_summary_skips_unreadable_directory(self, tmp_path, monkeypatch):
+        """Test that a subdirectory that can't be listed counts as empty."""
+        obj_path = tmp_path / "test_object"
+        for dir_name in ["filter", "mapping"]:
+            (obj_path / dir_name).mkdir(parents=True)
+            (obj_path / dir_name / "rules.yml").write_text("key: value\n")
+        
+        scandir = os.scandir
+        
+        def guarded_scandir(path):
+            if str(path).endswith("mapping"):
+                raise PermissionError(13, "Permission denied", str(path))
+            return scandir(path)
+        monkeypatch.setattr(os, "scandir", guarded_scandir)
+        
+        summary = FileLocator(str(obj_path)).get_structure_summary()
+        
+        assert sorted(summary["directories"]) == ["filter", "mapping"]
+        assert summary["yaml_files_count"] == 1
 
 
 class TestObjectValidator:
     """Tests for ObjectValidator class."""
     
-    def test_validate_valid_object(self, valid_object_path):
+    def test_validate_valid_object(self, validator):
         """Test validating a valid object structure."""
-        validator = ObjectValidator(valid_object_path)
         results = validator.validate()
         
         assert results["valid"] is True
@@ -106,23 +185,37 @@ class TestObjectValidator:
         assert results["valid"] is False
         assert len(results["errors"]) > 0
     
-    def test_validate_warnings(self, tmp_path):
+    def test_validate_warnings(self, minimal_object_skeleton):
         """Test validation warnings for missing YAML files."""
-        # Create minimal valid structure
+        validator = ObjectValidator(str(minimal_object_skeleton))
+        results = validator.validate()
+        
+        assert results["valid"] is True
+        assert len(results["warnings"]) > 0
+        assert any("YAML" in w for w in results["warnings"])
+    
+    def test_validate_required_path_not_directory(self, tmp_path):
+        """Test validation when a required directory is a regular file."""
         obj_path = tmp_path / "test_object"
         obj_path.mkdir()
         
-        for dir_name in ["flows", "filter", "mapping", "merging_rules"]:
+        for dir_name in ["flows", "filter", "mapping"]:
             (obj_path / dir_name).mkdir()
-        
-        # Create a minimal creation_flow.py
-        (obj_path / "flows" / "creation_flow.py").write_text(
-            "# Minimal flow\npass"
-        )
+        (obj_path / "merging_rules").write_text("not a directory")
+        (obj_path / "flows" / "creation_flow.py").write_text("pass")
         
         validator = ObjectValidator(str(obj_path))
         results = validator.validate()
         
-        assert results["valid"] is True
-        assert len(results["warnings"]) > 0
-        assert any("YAML" in w for w in results["warnings"])
+        assert results["valid"] is False
+        assert "Required path is not a directory: merging_rules" in results["errors"]
+    
+    def test_validate_with_existing_locator(self, minimal_object_skeleton):
+        """Test that a validator reuses a FileLocator passed to it."""
+        obj_path = minimal_object_skeleton
+        
+        locator = FileLocator(str(obj_path))
+        validator = ObjectValidator(str(obj_path), locator=locator)
+        
+        assert validator.locator is locator
+        assert validator.validate()["valid"] is True
@@ -1,5 +1,7 @@
 """Unit tests for Graph Builder"""
 
+import os
+from collections import OrderedDict
 import pytest
 from pathlib import Path
 
@@ -12,10 +14,72 @@ from src.graph.builder import (
 from src.models.task import Task, Edge, FlowGraph
 
 
-@pytest.fixture
-def valid_object_path():
-    """Provide path to valid test object."""
-    return "/Users/shormigo/Documents/BASE/Viatris/medicinal_product__rim_gxpd_all"
+def _write_minimal_flow(root: Path):
+    """Write a small object: two inputs merged into one pipeline, one YAML file per category."""
+    for dir_name in ["flows", "filter", "mapping", "merging_rules"]:
+        (root / dir_name).mkdir()
+    (root / "flows" / "creation_flow.py").write_text(
+        'read_main = ReadExcel(task_args=dict(name="Read Main"))\n'
+        'read_lookup = ReadExcel(task_args=dict(name="Read Lookup"))\n'
+        'filters_active = Filter(\n'
+        '    criteria_descriptions_file=full_path("migrations/flow/filter/filters_active.yml"),\n'
+        '    task_args=dict(name="Filter Active"),\n'
+        ')\n'
+        'table_merger = MergeTables(\n'
+        '    merging_rules=full_path("migrations/flow/merging_rules/table_merger.yml"),\n'
+        '    task_args=dict(name="Merge Lookup"),\n'
+        ')\n'
+        'create_new = Mapping(\n'
+        '    rules=full_path("migrations/flow/mapping/create_new.yml"),\n'
+        '    task_args=dict(name="Map Records"),\n'
+        ')\n'
+        'create = CreateObjects(task_args=dict(name="Create Records"))\n'
+        'report = GenerateReport(task_args=dict(name="Report"))\n'
+        'filters_active.set_upstream(task=read_main)\n'
+        'table_merger.set_upstream(task=filters_active)\n'
+        'table_merger.set_upstream(task=read_lookup)\n'
+        'create_new.set_upstream(task=table_merger)\n'
+        'create.set_upstream(task=create_new)\n'
+        'report.set_upstream(task=create)\n'
+    )
+    (root / "filter" / "filters_active.yml").write_text(
+        "- criteria_id: keep_active\n"
+        "  criteria:\n"
+        "    criteria: comparison\n"
+        "    field: status\n"
+        "    operator: equal\n"
+        "    value: active\n"
+    )
+    (root / "merging_rules" / "table_merger.yml").write_text(
+        "merging_rules:\n"
+        "  - table: lookup\n"
+        "    merge_on: [id]\n"
+    )
+    (root / "mapping" / "create_new.yml").write_text(
+        "mapping_rules:\n"
+        "  - id: map_name\n"
+        "    action: copy\n"
+    )
+
+
+@pytest.fixture(scope="session")
+def valid_object_path(tmp_path_factory):
+    """Synthetic object directory, written once per session."""
+    root = tmp_path_factory.mktemp("flow")
+    _write_minimal_flow(root)
+    return str(root)
+
+
+@pytest.fixture(scope="session")
+def flow_builder(valid_object_path):
+    """GraphBuilder for the shared object, reused across the session (treat as read-only)."""
+    return GraphBuilder(valid_object_path)
+
+
+@pytest.fixture(scope="session")
+def built_flow_result(flow_builder):
+    """Result of building the shared object once per session with flow_builder."""
+    return flow_builder.build()
 
 
 class TestGraphBuilder:
@@ -30,10 +94,9 @@ class TestGraphBuilder:
         assert builder.python_analysis is None
         assert builder.yaml_analyses == {}
     
-    def test_build_gxpd_flow(self, valid_object_path):
+    def test_build_gxpd_flow(self, built_flow_result):
         """Test building graph from real GxPD flow."""
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        result = built_flow_result
         
         assert isinstance(result, GraphBuildResult)
         assert result.success is True or len(result.errors) > 0  # May have warnings
@@ -41,28 +104,24 @@ class TestGraphBuilder:
         assert len(result.graph.tasks) > 0
         assert len(result.graph.edges) > 0
     
-    def test_build_result_contains_metadata(self, valid_object_path):
+    def test_build_result_contains_metadata(self, built_flow_result):
         """Test that build result contains metadata."""
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        result = built_flow_result
         
         assert 'object_name' in result.metadata
         assert 'task_count' in result.metadata
         assert 'edge_count' in result.metadata
         assert result.metadata['task_count'] > 0
     
-    def test_build_parses_yaml_files(self, valid_object_path):
+    def test_build_parses_yaml_files(self, flow_builder, built_flow_result):
         """Test that YAML files are parsed during build."""
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
-        
         # Should have parsed some YAML files
-        assert len(builder.yaml_analyses) > 0
+        assert len(flow_builder.yaml_analyses) > 0
     
-    def test_build_creates_valid_graph(self, valid_object_path):
+    def test_build_creates_valid_graph(self, flow_builder, built_flow_result):
         """Test that built graph is valid."""
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        builder = flow_builder
+        result = built_flow_result
         
         # Graph should have tasks from Python analysis
         assert len(result.graph.tasks) == len(builder.python_analysis.tasks)
@@ -79,10 +138,9 @@ class TestGraphBuilder:
         assert result.success is False
         assert len(result.errors) > 0
     
-    def test_yaml_enrichment(self, valid_object_path):
+    def test_yaml_enrichment(self, built_flow_result):
         """Test that tasks are enriched with YAML metadata."""
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        result = built_flow_result
         
         # Check if any tasks have yaml_metadata
         has_yaml_meta = any(
@@ -90,10 +148,139 @@ class TestGraphBuilder:
             for task in result.graph.tasks.values()
         )
         
-        # At least some tasks should have YAML metadata
-        # (This is soft check - depends on actual flow structure)
-        assert True  # Just verify no errors during enrichment
-
+        # Filter, merge and mapping tasks reference YAML files
+        assert has_yaml_meta
+    
+    def test_build_reuses_cached_parse(self, tmp_path, monkeypatch):
+        """Test that a second build of unchanged sources is served from the parse cache."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.delenv("BMF_FLOW_VIZ_NO_CACHE", raising=False)
+        
+        obj_path = tmp_path / "test_object"
+        for dir_name in ["flows", "filter", "mapping", "merging_rules"]:
+            (obj_path / dir_name).mkdir(parents=True)
+        (obj_path / "flows" / "creation_flow.py").write_text(
+            'read = ReadExcel(task_args=dict(name="Read"))\n'
+            'filt = Filter(task_args=dict(name="Filter"))\n'
+            'filt.set_upstream(task=read)\n'
+        )
+        
+        first = GraphBuilder(str(obj_path)).build()
+        assert list((tmp_path / "cache" / "bmf_flow_viz" / "ast").glob("*.pickle"))
+        
+        from src.parsers import python_parser
+        def fail_parse(self):
+            raise AssertionError("parser should not run on a cache hit")
+        monkeypatch.setattr(python_parser.ASTPythonParser, "parse", fail_parse)
+        # Skip the in-process result cache so the second build reads the parse cache
+        monkeypatch.setattr("src.graph.builder._build_cache", OrderedDict())
+        
+        second = GraphBuilder(str(obj_path)).build()
+        assert second.success is first.success is True
+        assert set(second.graph.tasks) == set(first.graph.tasks) == {"read", "filt"}
+        assert second.graph.edges == first.graph.edges
+    
+    def test_build_parses_many_yaml_files(self, tmp_path, monkeypatch):
+        """Test that a batch large enough for worker processes is parsed completely."""
+        monkeypatch.setenv("BMF_FLOW_VIZ_NO_CACHE", "1")
+        monkeypatch.setattr("os.cpu_count", lambda: 4)
+        
+        obj_path = tmp_path / "test_object"
+        for dir_name in ["flows", "filter", "mapping", "merging_rules"]:
+            (obj_path / dir_name).mkdir(parents=True)
+        (obj_path / "flows" / "creation_flow.py").write_text(
+            'read = ReadExcel(task_args=dict(name="Read"))\n'
+            'filt = Filter(task_args=dict(name="Filter"))\n'
+            'filt.set_upstream(task=read)\n'
+        )
+        for i in range(10):
+            (obj_path / "filter" / f"filters_{i}.yml").write_text(
+                f"- criteria_id: keep_{i}\n"
+                "  criteria:\n"
+                "    criteria: comparison\n"
+                "    field: status\n"
+                "    operator: equal\n"
+                "    value: active\n"
+            )
+        (obj_path / "filter" / "broken.yml").write_text("key: [unclosed\n")
+        
+        builder = GraphBuilder(str(obj_path))
+        result = builder.build()
+        
+        assert len(builder.yaml_analyses) == 11
+        assert builder.yaml_analyses["filter/filters_3.yml"].filter_criteria[0].criteria_id == "keep_3"
+        assert any(err.startswith("filter/broken.yml") for err in result.errors)
+    
+    def test_build_reuses_result_until_sources_change(self, tmp_path, monkeypatch):
+        """Test that repeat builds of unchanged sources reuse the parse but not the result."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.delenv("BMF_FLOW_VIZ_NO_CACHE", raising=False)
+        
+        obj_path = tmp_path / "test_object"
+        for dir_name in ["flows", "filter", "mapping", "merging_rules"]:
+            (obj_path / dir_name).mkdir(parents=True)
+        flow_file = obj_path / "flows" / "creation_flow.py"
+        flow_file.write_text(
+            'read = ReadExcel(task_args=dict(name="Read"))\n'
+            'filt = Filter(task_args=dict(name="Filter"))\n'
+            'filt.set_upstream(task=read)\n'
+        )
+        
+        first = GraphBuilder(str(obj_path)).build()
+        first.graph.add_task(Task(task_id="X", task_type="Filter", task_name="Caller task"))
+        first.graph.tasks["read"].metadata["note"] = "caller"
+        first.warnings.append("caller note")
+        
+        from src.parsers import python_parser
+        def fail_parse(self):
+            raise AssertionError("parser should not run on a cache hit")
+        with monkeypatch.context() as patch:
+            patch.setattr(python_parser.ASTPythonParser, "parse", fail_parse)
+            patch.setattr("src.parsers._ast_cache.load", lambda key: None)
+            builder = GraphBuilder(str(obj_path))
+            again = builder.build()
+        
+        assert again is not first
+        assert builder.graph is again.graph is not first.graph
+        assert set(again.graph.tasks) == {"read", "filt"}
+        assert "note" not in again.graph.tasks["read"].metadata
+        assert "caller note" not in again.warnings
+        assert again.metadata["task_count"] == 2
+        
+        flow_file.write_text(
+            'read = ReadExcel(task_args=dict(name="Read"))\n'
+            'filt = Filter(task_args=dict(name="Filter"))\n'
+            'filt.set_upstream(task=read)\n'
+            'report = GenerateReport(task_args=dict(name="Report"))\n'
+            'report.set_upstream(task=filt)\n'
+        )
+        mtime_ns = flow_file.stat().st_mtime_ns + 1_000_000_000
+        os.utime(flow_file, ns=(mtime_ns, mtime_ns))
+        
+        rebuilt = GraphBuilder(str(obj_path)).build()
+        assert rebuilt is not first
+        assert set(rebuilt.graph.tasks) == {"read", "filt", "report"}
+    
+    def test_find_yaml_references(self, tmp_path):
+        """Test matching task parameters to parsed YAML files by filename and path."""
+        builder = GraphBuilder(str(tmp_path))
+        builder.yaml_analyses = {
+            "filter/filters_active.yml": None,
+            "mapping/filters_active.yml": None,
+            "merging_rules/table_merger_main.yml": None,
+            "mapping/rules": None,
+        }
+        
+        by_filename = Task(task_id="f", task_type="Filter", task_name="F",
+                           parameters={"criteria_descriptions_file": "objects/x/filter/filters_active.yml"})
+        by_path = Task(task_id="m", task_type="Mapping", task_name="M",
+                       parameters={"rules": "objects/x/mapping/rules"})
+        by_name = Task(task_id="table_merger_main", task_type="MergeTables", task_name="T",
+                       parameters={"merging_rules": "full_path(...)"})
+        
+        assert builder._find_yaml_references(by_filename) == ["filter/filters_active.yml"]
+        assert builder._find_yaml_references(by_path) == ["mapping/rules"]
+        assert builder._find_yaml_references(by_name) == ["merging_rules/table_merger_main.yml"]
 
 class TestDependencyResolver:
     """Test suite for DependencyResolver class."""
@@ -163,6 +350,57 @@ class TestDependencyResolver:
         assert resolver.get_dependency_depth("C") == 2
         assert resolver.get_dependency_depth("D") == 2
     
+    def test_get_dependency_depth_shared_ancestors(self):
+        """Test dependency depth on a lattice whose path count is exponential."""
+        graph = FlowGraph(object_name="test", object_path="/test")
+        layers = [[f"L{depth}_{i}" for i in range(2)] for depth in range(60)]
+        for layer in layers:
+            for task_id in layer:
+                graph.add_task(Task(task_id=task_id, task_type="Filter", task_name=task_id))
+        for upper, lower in zip(layers, layers[1:]):
+            for source_id in upper:
+                for target_id in lower:
+                    graph.add_edge(Edge(source_id=source_id, target_id=target_id))
+        
+        resolver = DependencyResolver(graph)
+        assert resolver.get_dependency_depth("L59_0") == 59
+        assert resolver.get_dependency_depth("L30_1") == 30
+    
+    def test_execution_order_sees_added_edges(self, simple_graph):
+        """Test that cached adjacency is rebuilt after edges are added."""
+        resolver = DependencyResolver(simple_graph)
+        assert resolver.get_dependency_depth("D") == 2
+        
+        simple_graph.add_task(Task(task_id="E", task_type="GenerateReport", task_name="Report"))
+        simple_graph.add_edge(Edge(source_id="D", target_id="E"))
+        
+        assert resolver.get_dependency_depth("E") == 3
+        assert resolver.get_execution_order()[-1] == ["E"]
+    
+    def test_execution_order_sees_replaced_edges(self, simple_graph):
+        """Test that cached adjacency is rebuilt after a replacement that keeps the edge count."""
+        resolver = DependencyResolver(simple_graph)
+        assert resolver.get_dependency_depth("D") == 2
+        
+        simple_graph.edges = [*simple_graph.edges[:2], Edge(source_id="C", target_id="D")]
+        
+        assert resolver.get_dependency_depth("D") == 3
+        assert resolver.get_execution_order() == [["A"], ["B"], ["C"], ["D"]]
+    
+    def test_find_critical_path_stops_at_cycle(self):
+        """Test that the critical path ends where only cyclic tasks remain downstream."""
+        graph = FlowGraph(object_name="test", object_path="/test")
+        for task_id in ["A", "B", "C", "D"]:
+            graph.add_task(Task(task_id=task_id, task_type="Filter", task_name=task_id))
+        graph.add_edge(Edge(source_id="A", target_id="B"))
+        graph.add_edge(Edge(source_id="B", target_id="C"))
+        graph.add_edge(Edge(source_id="C", target_id="D"))
+        graph.add_edge(Edge(source_id="D", target_id="C"))
+    
+        resolver = DependencyResolver(graph)
+        assert resolver.find_critical_path() == ["A", "B"]
+        assert resolver.get_dependency_depth("B") == 1
+    
     def test_execution_order_single_task(self):
         """Test execution order for single task."""
         graph = FlowGraph(object_name="test", object_path="/test")
@@ -222,7 +460,7 @@ class TestGraphValidator:
         graph = FlowGraph(object_name="test", object_path="/test")
         graph.add_task(Task(task_id="A", task_type="ReadExcel", task_name="Task A"))
         # Add edge to non-existent task
-        graph.edges.append(Edge(source_id="A", target_id="NonExistent"))
+        graph.edges = [*graph.edges, Edge(source_id="A", target_id="NonExistent")]
         
         validator = GraphValidator(graph)
         is_valid, errors, warnings = validator.validate()
@@ -267,6 +505,21 @@ class TestGraphValidator:
         assert is_valid is False
         assert any("cycle" in e.lower() for e in errors)
     
+    def test_detect_cycle_deep_chain(self):
+        """Test cycle detection on a chain deeper than the recursion limit."""
+        graph = FlowGraph(object_name="test", object_path="/test")
+        task_ids = [f"T{i}" for i in range(2000)]
+        for task_id in task_ids:
+            graph.add_task(Task(task_id=task_id, task_type="Filter", task_name=task_id))
+        for source_id, target_id in zip(task_ids, task_ids[1:]):
+            graph.add_edge(Edge(source_id=source_id, target_id=target_id))
+        
+        validator = GraphValidator(graph)
+        assert validator._has_cycles() is False
+        
+        graph.add_edge(Edge(source_id=task_ids[-1], target_id=task_ids[0]))
+        assert validator._has_cycles() is True
+    
     def test_find_unreachable_tasks(self):
         """Test finding unreachable tasks."""
         graph = FlowGraph(object_name="test", object_path="/test")
@@ -294,14 +547,13 @@ class TestGraphValidator:
         assert any("unreachable" in w.lower() for w in warnings)
 
 
+@pytest.mark.integration
 class TestGraphBuilderIntegration:
     """Integration tests for graph building."""
     
-    def test_build_and_validate_gxpd(self, valid_object_path):
+    def test_build_and_validate_gxpd(self, built_flow_result):
         """Test full build and validation pipeline on GxPD flow."""
-        # Build graph
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        result = built_flow_result
         
         # Validate graph
         validator = GraphValidator(result.graph)
@@ -315,11 +567,9 @@ class TestGraphBuilderIntegration:
         # (Real flows may have some issues but should still build)
         assert True  # Just verify pipeline completes
     
-    def test_dependency_analysis_on_built_graph(self, valid_object_path):
+    def test_dependency_analysis_on_built_graph(self, built_flow_result):
         """Test dependency analysis on built graph."""
-        # Build graph
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        result = built_flow_result
         
         # Analyze dependencies
         resolver = DependencyResolver(result.graph)
@@ -334,11 +584,9 @@ class TestGraphBuilderIntegration:
         total_in_layers = sum(len(layer) for layer in layers)
         assert total_in_layers <= len(result.graph.tasks)
     
-    def test_end_to_end_graph_construction(self, valid_object_path):
+    def test_end_to_end_graph_construction(self, built_flow_result):
         """Test complete end-to-end graph construction."""
-        # Build
-        builder = GraphBuilder(valid_object_path)
-        result = builder.build()
+        result = built_flow_result
         
         # Validate
         validator = GraphValidator(result.graph)
@@ -47,3 +47,19 @@ class TestMermaidGenerator:
         # Labeled edges
         assert 'VIRTIFY -->|Read Excel| MERGE' in code
         assert 'COUNTRY -->|Read Excel| MERGE' in code
+
+    def test_hidden_utility_chain_is_bypassed(self):
+        """Test that a chain of hidden utility tasks collapses into one direct edge."""
+        g = FlowGraph(object_name="test", object_path="/test")
+        g.add_task(Task(task_id="A", task_type="ReadExcel", task_name="Read"))
+        g.add_task(Task(task_id="ENV1", task_type="SetEnv", task_name="Env 1"))
+        g.add_task(Task(task_id="ENV2", task_type="SetEnvironmentVariables", task_name="Env 2"))
+        g.add_task(Task(task_id="B", task_type="Filter", task_name="Filter"))
+        g.add_edge(Edge(source_id="A", target_id="ENV1"))
+        g.add_edge(Edge(source_id="ENV1", target_id="ENV2"))
+        g.add_edge(Edge(source_id="ENV2", target_id="B"))
+        g.add_edge(Edge(source_id="A", target_id="B"))
+
+        code = MermaidGenerator(hide_utility_tasks=True).generate(g)
+        assert "ENV" not in code
+        assert code.count("A --> B") == 1
@@ -4,6 +4,14 @@ import pytest
 from src.models.task import Task, Edge, FlowGraph
 
 
+def _graph_with_tasks(n):
+    """Graph holding tasks t0..t{n-1}, returned with the task list."""
+    graph = FlowGraph("test_obj", "/path")
+    tasks = [Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}") for i in range(n)]
+    graph.add_tasks(tasks)
+    return graph, tasks
+
+
 class TestTask:
     """Tests for Task class."""
     
@@ -47,6 +55,15 @@ class TestTask:
         assert task.metadata["color"] == "#E3F2FD"
         assert task.metadata["line_number"] == 10
     
+    def test_task_update_metadata(self):
+        """Test adding several metadata entries at once."""
+        task = Task(task_id="task_1", task_type="Filter", task_name="Task 1")
+        task.set_metadata("color", "#FFFFFF")
+        
+        task.update_metadata({"color": "#E3F2FD", "category": "filter"})
+        
+        assert task.metadata == {"color": "#E3F2FD", "category": "filter"}
+    
     def test_task_equality(self):
         """Test task equality based on ID."""
         task1 = Task(task_id="task_1", task_type="Filter", task_name="T1")
@@ -169,20 +186,83 @@ class TestFlowGraph:
         with pytest.raises(ValueError):
             graph.add_edge(edge)
     
-    def test_get_upstream_tasks(self):
-        """Test getting upstream tasks."""
+    def test_add_duplicate_edge(self):
+        """Test that an edge between the same tasks is only added once."""
         graph = FlowGraph("test_obj", "/path")
+        graph.add_task(Task(task_id="t1", task_type="ReadExcel", task_name="T1"))
+        graph.add_task(Task(task_id="t2", task_type="Filter", task_name="T2"))
         
-        tasks = [
-            Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}")
-            for i in range(3)
-        ]
+        graph.add_edge(Edge(source_id="t1", target_id="t2"))
+        graph.add_edge(Edge(source_id="t1", target_id="t2", label="again"))
         
-        for task in tasks:
-            graph.add_task(task)
+        assert len(graph.edges) == 1
+    
+    def test_add_tasks_and_edges_in_bulk(self):
+        """Test that bulk adds dedup edges and reject a bad batch as a whole."""
+        graph = FlowGraph("test_obj", "/path")
+        graph.add_tasks(Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}") for i in range(3))
+    
+        with pytest.raises(ValueError):
+            graph.add_tasks([
+                Task(task_id="t3", task_type="Filter", task_name="T3"),
+                Task(task_id="t0", task_type="Filter", task_name="T0"),
+            ])
+        assert list(graph.tasks) == ["t0", "t1", "t2"]
+    
+        graph.add_edges([
+            Edge(source_id="t0", target_id="t1"),
+            Edge(source_id="t0", target_id="t1"),
+            Edge(source_id="t1", target_id="t2"),
+        ])
+        assert len(graph.edges) == 2
+    
+        with pytest.raises(ValueError):
+            graph.add_edges([
+                Edge(source_id="t0", target_id="t2"),
+                Edge(source_id="t2", target_id="missing"),
+            ])
+        assert len(graph.edges) == 2
+        assert graph.get_downstream_tasks("t0") == [graph.tasks["t1"]]
+    
+    def test_edges_are_read_only(self):
+        """Test that graph.edges can't be edited in place."""
+        graph, tasks = _graph_with_tasks(2)
+        graph.add_edge(Edge(source_id="t0", target_id="t1"))
+        
+        with pytest.raises(AttributeError):
+            graph.edges.append(Edge(source_id="t1", target_id="t0"))
+        with pytest.raises(TypeError):
+            graph.edges[0] = Edge(source_id="t1", target_id="t0")
         
-        graph.add_edge(Edge(source_id="t0", target_id="t2"))
+        assert graph.edges == (Edge(source_id="t0", target_id="t1"),)
+    
+    def test_edges_replaced_by_assignment(self):
+        """Test that lookups see edges assigned to graph.edges without add_edge."""
+        graph, tasks = _graph_with_tasks(3)
+        graph.add_edge(Edge(source_id="t0", target_id="t1"))
+        revision = graph.edge_revision
+        
+        graph.edges = [*graph.edges, Edge(source_id="t1", target_id="t2")]
+        
+        assert graph.edge_revision != revision
+        assert graph.get_downstream_tasks("t1") == [tasks[2]]
+        assert graph.get_upstream_tasks("t2") == [tasks[1]]
+        assert graph.get_leaf_tasks() == [tasks[2]]
         graph.add_edge(Edge(source_id="t1", target_id="t2"))
+        assert len(graph.edges) == 2
+        
+        graph.edges = [Edge(source_id="t2", target_id="t0")]
+        assert graph.get_upstream_tasks("t0") == [tasks[2]]
+        assert graph.get_downstream_tasks("t1") == []
+    
+    def test_get_upstream_tasks(self):
+        """Test getting upstream tasks."""
+        graph, tasks = _graph_with_tasks(3)
+        
+        graph.add_edges([
+            Edge(source_id="t0", target_id="t2"),
+            Edge(source_id="t1", target_id="t2"),
+        ])
         
         upstream = graph.get_upstream_tasks("t2")
         
@@ -192,18 +272,12 @@ class TestFlowGraph:
     
     def test_get_downstream_tasks(self):
         """Test getting downstream tasks."""
-        graph = FlowGraph("test_obj", "/path")
-        
-        tasks = [
-            Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}")
-            for i in range(3)
-        ]
+        graph, tasks = _graph_with_tasks(3)
         
-        for task in tasks:
-            graph.add_task(task)
-        
-        graph.add_edge(Edge(source_id="t0", target_id="t1"))
-        graph.add_edge(Edge(source_id="t0", target_id="t2"))
+        graph.add_edges([
+            Edge(source_id="t0", target_id="t1"),
+            Edge(source_id="t0", target_id="t2"),
+        ])
         
         downstream = graph.get_downstream_tasks("t0")
         
@@ -213,18 +287,12 @@ class TestFlowGraph:
     
     def test_get_root_tasks(self):
         """Test getting root tasks."""
-        graph = FlowGraph("test_obj", "/path")
-        
-        tasks = [
-            Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}")
-            for i in range(3)
-        ]
+        graph, tasks = _graph_with_tasks(3)
         
-        for task in tasks:
-            graph.add_task(task)
-        
-        graph.add_edge(Edge(source_id="t0", target_id="t1"))
-        graph.add_edge(Edge(source_id="t1", target_id="t2"))
+        graph.add_edges([
+            Edge(source_id="t0", target_id="t1"),
+            Edge(source_id="t1", target_id="t2"),
+        ])
         
         roots = graph.get_root_tasks()
         
@@ -233,11 +301,25 @@ class TestFlowGraph:
     
     def test_get_leaf_tasks(self):
         """Test getting leaf tasks."""
+        graph, tasks = _graph_with_tasks(3)
+        
+        graph.add_edges([
+            Edge(source_id="t0", target_id="t1"),
+            Edge(source_id="t1", target_id="t2"),
+        ])
+        
+        leaves = graph.get_leaf_tasks()
+        
+        assert len(leaves) == 1
+        assert tasks[2] in leaves
+    
+    def test_get_roots_and_leaves(self):
+        """Test getting root and leaf tasks together."""
         graph = FlowGraph("test_obj", "/path")
         
         tasks = [
             Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}")
-            for i in range(3)
+            for i in range(4)
         ]
         
         for task in tasks:
@@ -246,10 +328,26 @@ class TestFlowGraph:
         graph.add_edge(Edge(source_id="t0", target_id="t1"))
         graph.add_edge(Edge(source_id="t1", target_id="t2"))
         
-        leaves = graph.get_leaf_tasks()
+        roots, leaves = graph.get_roots_and_leaves()
         
-        assert len(leaves) == 1
-        assert tasks[2] in leaves
+        assert roots == graph.get_root_tasks() == [tasks[0], tasks[3]]
+        assert leaves == graph.get_leaf_tasks() == [tasks[2], tasks[3]]
+    
+    def test_find_cycles(self):
+        """Test finding dependency cycles."""
+        graph = FlowGraph("test_obj", "/path")
+        
+        for i in range(4):
+            graph.add_task(Task(task_id=f"t{i}", task_type="Filter", task_name=f"T{i}"))
+        
+        graph.add_edge(Edge(source_id="t0", target_id="t1"))
+        graph.add_edge(Edge(source_id="t1", target_id="t2"))
+        assert graph.find_cycles() == []
+        
+        graph.add_edge(Edge(source_id="t2", target_id="t1"))
+        graph.add_edge(Edge(source_id="t3", target_id="t3"))
+        
+        assert graph.find_cycles() == [["t1", "t2"], ["t3"]]
     
     def test_validate_graph(self):
         """Test graph validation."""
@@ -260,8 +358,7 @@ class TestFlowGraph:
             for i in range(3)
         ]
         
-        for task in tasks:
-            graph.add_task(task)
+        graph.add_tasks(tasks)
         
         graph.add_edge(Edge(source_id="t0", target_id="t1"))
         
@@ -276,8 +373,7 @@ class TestFlowGraph:
         task1 = Task(task_id="t1", task_type="Filter", task_name="T1")
         task2 = Task(task_id="t2", task_type="Filter", task_name="T2")
         
-        graph.add_task(task1)
-        graph.add_task(task2)
+        graph.add_tasks([task1, task2])
         
         graph.add_edge(Edge(source_id="t1", target_id="t2"))
         
@@ -1,5 +1,6 @@
 """Unit tests for YAML Parser"""
 
+import os
 import pytest
 from pathlib import Path
 from tempfile import NamedTemporaryFile
@@ -12,8 +13,13 @@ from src.parsers.yaml_parser import (
     FilterCriteria,
     MappingRule,
     parse_yaml_file,
+    parse_yaml_files,
+    parse_yaml_stream,
 )
 
+# libyaml-backed dumper for writing fixture files, when available
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 class TestYAMLParser:
     """Test suite for YAMLParser class."""
@@ -41,6 +47,17 @@ class TestYAMLParser:
         with pytest.raises(ValueError):
             YAMLParser(str(wrong_file))
     
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+    def test_fifo_rejected_without_blocking(self, tmp_path):
+        """Test that a named pipe is rejected, by YAMLParser and parse_yaml_files, without opening it."""
+        fifo = tmp_path / "rules.yml"
+        os.mkfifo(fifo)
+        
+        with pytest.raises(FileNotFoundError, match="not a file"):
+            YAMLParser(str(fifo))
+        with pytest.raises(FileNotFoundError, match="not a file"):
+            parse_yaml_files([str(fifo)])
+    
     def test_parse_empty_yaml(self, tmp_path):
         """Test parsing empty YAML file."""
         yaml_file = tmp_path / "empty.yaml"
@@ -52,29 +69,71 @@ class TestYAMLParser:
         assert analysis.file_type == 'unknown'
         assert len(analysis.warnings) > 0
     
-    def test_determine_file_type_merge(self):
-        """Test file type detection for merge rules."""
-        parser = YAMLParser.__new__(YAMLParser)
-        data = {'merging_rules': []}
-        file_type = parser._determine_file_type(data)
+    def test_parse_reuses_loaded_yaml_until_file_changes(self, tmp_path, monkeypatch):
+        """Test that an unchanged file is not re-loaded, and a changed one is."""
+        loads = []
+        real_load = yaml.load
+        monkeypatch.setattr(yaml, "load", lambda *args, **kwargs: loads.append(1) or real_load(*args, **kwargs))
+        
+        yaml_file = tmp_path / "cached.yaml"
+        yaml_file.write_text("merging_rules:\n  - table: a\n")
+        
+        first = YAMLParser(str(yaml_file), include_raw=True).parse()
+        second = YAMLParser(str(yaml_file), include_raw=True).parse()
+        assert len(loads) == 1
+        assert second.raw_data == first.raw_data
+        assert second.raw_data is not first.raw_data
+        
+        yaml_file.write_text("merging_rules:\n  - table: a\n  - table: b\n")
+        third = YAMLParser(str(yaml_file)).parse()
+        assert len(loads) == 2
+        assert [r.table for r in third.merge_rules] == ["a", "b"]
+    
+    def test_parse_shares_repeated_strings(self, tmp_path):
+        """Test that repeated scalars load as one shared string object."""
+        yaml_file = tmp_path / "shared.yaml"
+        yaml_file.write_text(
+            "merging_rules:\n"
+            "  - table: a\n    merge_type: left\n"
+            "  - table: b\n    merge_type: left\n"
+        )
+        
+        data = YAMLParser(str(yaml_file), include_raw=True).parse().raw_data
         
-        assert file_type == 'merge'
+        first, second = data['merging_rules']
+        assert first['merge_type'] is second['merge_type']
     
-    def test_determine_file_type_filter(self):
-        """Test file type detection for filter rules."""
-        parser = YAMLParser.__new__(YAMLParser)
-        data = {'filter': [{'criteria': {}}]}
-        file_type = parser._determine_file_type(data)
+    def test_parse_keeps_raw_data_only_on_request(self, tmp_path):
+        """Test that the loaded document is retained only with include_raw."""
+        yaml_file = tmp_path / "raw.yaml"
+        yaml_file.write_text("mapping_rules:\n  - id: m1\n")
         
-        assert file_type == 'filter'
+        assert YAMLParser(str(yaml_file)).parse().raw_data == {}
+        assert parse_yaml_file(str(yaml_file), include_raw=True).raw_data == {'mapping_rules': [{'id': 'm1'}]}
+    
+    def test_from_string(self):
+        """Test parsing YAML text without a file."""
+        text = "mapping_rules:\n  - id: m1\n---\nmerging_rules:\n  - table: a\n"
+        parser = YAMLParser.from_string(text, yaml_path="mapping/inline.yml")
     
-    def test_determine_file_type_mapping(self):
-        """Test file type detection for mapping rules."""
+        assert parser.raw_content == text
+        assert [a.file_type for a in parser.parse_documents()] == ['mapping', 'merge']
+    
+        analysis = YAMLParser.from_string("mapping_rules:\n  - id: m1\n", include_raw=True).parse()
+        assert analysis.file_type == 'mapping'
+        assert analysis.file_path == Path("<string>")
+        assert analysis.raw_data == {'mapping_rules': [{'id': 'm1'}]}
+    
+    @pytest.mark.parametrize("data, expected", [
+        ({'merging_rules': []}, 'merge'),
+        ({'filter': [{'criteria': {}}]}, 'filter'),
+        ({'mapping_rules': []}, 'mapping'),
+    ], ids=["merge", "filter", "mapping"])
+    def test_determine_file_type(self, data, expected):
+        """Test file type detection for merge, filter and mapping rules."""
         parser = YAMLParser.__new__(YAMLParser)
-        data = {'mapping_rules': []}
-        file_type = parser._determine_file_type(data)
         
-        assert file_type == 'mapping'
+        assert parser._determine_file_type(data) == expected
 
 
 class TestMergeRuleParsing:
@@ -101,7 +160,7 @@ class TestMergeRuleParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
+        yaml_file.write_text(yaml.dump(yaml_content, Dumper=Dumper))
         
         parser = YAMLParser(str(yaml_file))
         analysis = parser.parse()
@@ -115,9 +174,8 @@ class TestMergeRuleParsing:
         assert rule.merge_type == 'left'
         assert rule.suffixes == ('_main', '_sec')
     
-    def test_parse_multiple_merge_rules(self, tmp_path):
+    def test_parse_multiple_merge_rules(self):
         """Test parsing multiple merge rules."""
-        yaml_file = tmp_path / "merge_multi.yaml"
         yaml_content = {
             'merging_rules': [
                 {
@@ -135,9 +193,7 @@ class TestMergeRuleParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string(yaml.dump(yaml_content, Dumper=Dumper))
         analysis = parser.parse()
         
         assert len(analysis.merge_rules) == 3
@@ -167,7 +223,7 @@ class TestFilterCriteriaParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
+        yaml_file.write_text(yaml.dump(yaml_content, Dumper=Dumper))
         
         parser = YAMLParser(str(yaml_file))
         analysis = parser.parse()
@@ -182,9 +238,8 @@ class TestFilterCriteriaParsing:
         assert criterion.operator == 'equal'
         assert criterion.value == 'Active'
     
-    def test_parse_is_unique_filter(self, tmp_path):
+    def test_parse_is_unique_filter(self):
         """Test parsing is_unique filter criteria."""
-        yaml_file = tmp_path / "filter_unique.yaml"
         yaml_content = {
             'filters': [
                 {
@@ -199,9 +254,7 @@ class TestFilterCriteriaParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string(yaml.dump(yaml_content, Dumper=Dumper))
         analysis = parser.parse()
         
         assert len(analysis.filter_criteria) == 1
@@ -211,9 +264,8 @@ class TestFilterCriteriaParsing:
         assert criterion.keep == 'first'
         assert criterion.subset == ['ID']
     
-    def test_parse_is_null_filter(self, tmp_path):
+    def test_parse_is_null_filter(self):
         """Test parsing is_null filter criteria."""
-        yaml_file = tmp_path / "filter_null.yaml"
         yaml_content = {
             'filters': [
                 {
@@ -228,9 +280,7 @@ class TestFilterCriteriaParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string(yaml.dump(yaml_content, Dumper=Dumper))
         analysis = parser.parse()
         
         assert len(analysis.filter_criteria) == 1
@@ -240,9 +290,8 @@ class TestFilterCriteriaParsing:
         assert criterion.field == 'Authorization Number'
         assert criterion.negate is True
     
-    def test_parse_multiple_filters(self, tmp_path):
+    def test_parse_multiple_filters(self):
         """Test parsing multiple filter criteria."""
-        yaml_file = tmp_path / "filters_multi.yaml"
         yaml_content = {
             'filters': [
                 {
@@ -260,9 +309,7 @@ class TestFilterCriteriaParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string(yaml.dump(yaml_content, Dumper=Dumper))
         analysis = parser.parse()
         
         assert len(analysis.filter_criteria) == 3
@@ -291,7 +338,7 @@ class TestMappingRuleParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
+        yaml_file.write_text(yaml.dump(yaml_content, Dumper=Dumper))
         
         parser = YAMLParser(str(yaml_file))
         analysis = parser.parse()
@@ -306,9 +353,8 @@ class TestMappingRuleParsing:
         assert rule.target == 'object_name'
         assert rule.overwrite is True
     
-    def test_parse_object_lookup_mapping_rule(self, tmp_path):
+    def test_parse_object_lookup_mapping_rule(self):
         """Test parsing object lookup mapping rule."""
-        yaml_file = tmp_path / "mapping_lookup.yaml"
         yaml_content = {
             'mapping_rules': [
                 {
@@ -321,9 +367,7 @@ class TestMappingRuleParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string(yaml.dump(yaml_content, Dumper=Dumper))
         analysis = parser.parse()
         
         assert len(analysis.mapping_rules) == 1
@@ -333,9 +377,8 @@ class TestMappingRuleParsing:
         assert rule.object == 'controlled_vocabulary__rim'
         assert rule.source == ['lookup_constant', 'value_constant']
     
-    def test_parse_multiple_mapping_rules(self, tmp_path):
+    def test_parse_multiple_mapping_rules(self):
         """Test parsing multiple mapping rules."""
-        yaml_file = tmp_path / "mapping_multi.yaml"
         yaml_content = {
             'mapping_rules': [
                 {
@@ -357,61 +400,35 @@ class TestMappingRuleParsing:
             ]
         }
         
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string(yaml.dump(yaml_content, Dumper=Dumper))
         analysis = parser.parse()
         
         assert len(analysis.mapping_rules) == 3
 
 
+@pytest.mark.integration
 class TestYAMLIntegration:
     """Integration tests with real YAML structures."""
     
-    def test_parse_gxpd_merge_file(self):
-        """Test parsing actual GXPD merge rules file."""
-        merge_file = Path("/Users/shormigo/Documents/BASE/Viatris/medicinal_product__rim_gxpd_all/merging_rules/table_merger_gxpd_exports.yml")
-        
-        if not merge_file.exists():
-            pytest.skip("Real GXPD merge file not available")
-        
-        parser = YAMLParser(str(merge_file))
-        analysis = parser.parse()
-        
-        assert analysis.file_type == 'merge'
-        assert len(analysis.merge_rules) > 0
-        # Verify first rule has expected structure
-        assert all(hasattr(rule, 'table') for rule in analysis.merge_rules)
-    
-    def test_parse_gxpd_filter_file(self):
-        """Test parsing actual GXPD filter file."""
-        filter_file = Path("/Users/shormigo/Documents/BASE/Viatris/medicinal_product__rim_gxpd_all/filter/filtered_gxpd_export.yml")
-        
-        if not filter_file.exists():
-            pytest.skip("Real GXPD filter file not available")
-        
-        parser = YAMLParser(str(filter_file))
-        analysis = parser.parse()
-        
-        assert analysis.file_type == 'filter'
-        assert len(analysis.filter_criteria) > 0
-        # Verify filters have expected structure
-        assert all(hasattr(c, 'criteria_id') for c in analysis.filter_criteria)
-    
-    def test_parse_gxpd_mapping_file(self):
-        """Test parsing actual GXPD mapping file."""
-        mapping_file = Path("/Users/shormigo/Documents/BASE/Viatris/medicinal_product__rim_gxpd_all/mapping/create_new.yml")
-        
-        if not mapping_file.exists():
-            pytest.skip("Real GXPD mapping file not available")
-        
-        parser = YAMLParser(str(mapping_file))
-        analysis = parser.parse()
-        
-        assert analysis.file_type == 'mapping'
-        assert len(analysis.mapping_rules) > 0
-        # Verify mappings have expected structure
-        assert all(hasattr(rule, 'rule_id') for rule in analysis.mapping_rules)
+    @pytest.mark.parametrize("relative_path, file_type, rules_attr, id_attr", [
+        ("merging_rules/table_merger_gxpd_exports.yml", "merge", "merge_rules", "table"),
+        ("filter/filtered_gxpd_export.yml", "filter", "filter_criteria", "criteria_id"),
+        ("mapping/create_new.yml", "mapping", "mapping_rules", "rule_id"),
+    ], ids=["merge", "filter", "mapping"])
+    def test_parse_gxpd_file(self, test_object_path, relative_path, file_type, rules_attr, id_attr):
+        """Test parsing actual GXPD merge, filter and mapping files."""
+        yaml_file = test_object_path / relative_path
+        
+        if not yaml_file.exists():
+            pytest.skip(f"Real GXPD {file_type} file not available")
+        
+        analysis = YAMLParser(str(yaml_file)).parse()
+        
+        assert analysis.file_type == file_type
+        rules = getattr(analysis, rules_attr)
+        assert len(rules) > 0
+        # Verify rules have expected structure
+        assert all(hasattr(rule, id_attr) for rule in rules)
 
 
 class TestDataClasses:
@@ -478,16 +495,9 @@ class TestErrorHandling:
         # Either has errors or warnings for malformed content
         assert len(analysis.errors) > 0 or len(analysis.warnings) > 0
     
-    def test_parse_invalid_merge_structure(self, tmp_path):
+    def test_parse_invalid_merge_structure(self):
         """Test parsing invalid merge rule structure."""
-        yaml_file = tmp_path / "invalid_merge.yaml"
-        yaml_content = {
-            'merging_rules': "not_a_list"
-        }
-        
-        yaml_file.write_text(yaml.dump(yaml_content))
-        
-        parser = YAMLParser(str(yaml_file))
+        parser = YAMLParser.from_string("merging_rules: not_a_list\n")
         analysis = parser.parse()
         
         assert len(analysis.errors) > 0
@@ -495,10 +505,98 @@ class TestErrorHandling:
     def test_convenience_function(self, tmp_path):
         """Test parse_yaml_file convenience function."""
         yaml_file = tmp_path / "test.yaml"
-        yaml_content = {'mapping_rules': [{'id': 'test'}]}
-        yaml_file.write_text(yaml.dump(yaml_content))
+        yaml_file.write_text("mapping_rules:\n  - id: test\n")
         
         analysis = parse_yaml_file(str(yaml_file))
         
         assert analysis.file_type == 'mapping'
         assert len(analysis.mapping_rules) == 1
+    
+    def test_parse_yaml_files_keeps_input_order(self, tmp_path):
+        """Test parse_yaml_files returns one analysis per path, in order."""
+        paths = []
+        for key in ['mapping_rules', 'merging_rules', 'filters', 'mapping_rules']:
+            yaml_file = tmp_path / f"{len(paths)}.yaml"
+            yaml_file.write_text(f"{key}: []\n")
+            paths.append(str(yaml_file))
+        
+        analyses = parse_yaml_files(paths, workers=2)
+        
+        assert [a.file_type for a in analyses] == ['mapping', 'merge', 'filter', 'mapping']
+        assert [str(a.file_path) for a in analyses] == paths
+    
+    def test_parse_yaml_files_without_process_pool(self, tmp_path, monkeypatch):
+        """Test parse_yaml_files parses serially when no worker pool can be started."""
+        def no_pool(*args, **kwargs):
+            raise OSError("no semaphores")
+        monkeypatch.setattr("src.utils.parallel.ProcessPoolExecutor", no_pool)
+        paths = []
+        for index in range(8):
+            yaml_file = tmp_path / f"{index}.yaml"
+            yaml_file.write_text("filters: []\n")
+            paths.append(str(yaml_file))
+        
+        analyses = parse_yaml_files(paths, workers=2)
+        
+        assert [a.file_type for a in analyses] == ['filter'] * 8
+    
+    def test_parse_yaml_files_uses_parse_cache(self, tmp_path, monkeypatch):
+        """Test parse_yaml_files serves unchanged files from the parse cache unless disabled."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.delenv("BMF_FLOW_VIZ_NO_CACHE", raising=False)
+        yaml_file = tmp_path / "mapping.yaml"
+        yaml_file.write_text("mapping_rules:\n  - id: m1\n")
+        
+        first = parse_yaml_files([str(yaml_file)])
+        
+        def fail_parse(self):
+            raise AssertionError("parser should not run on a cache hit")
+        monkeypatch.setattr(YAMLParser, "parse", fail_parse)
+        second = parse_yaml_files([str(yaml_file)])
+        assert [rule.rule_id for rule in second[0].mapping_rules] == ["m1"]
+        assert second[0] is not first[0]
+        
+        monkeypatch.setenv("BMF_FLOW_VIZ_NO_CACHE", "1")
+        with pytest.raises(AssertionError):
+            parse_yaml_files([str(yaml_file)])
+    
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions only")
+    @pytest.mark.parametrize("unsafe", ["group_writable", "world_writable", "foreign_owner"])
+    def test_parse_yaml_files_ignores_unsafe_cache_dir(self, tmp_path, monkeypatch, unsafe):
+        """Test parse_yaml_files neither reads nor writes a cache directory others control."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.delenv("BMF_FLOW_VIZ_NO_CACHE", raising=False)
+        cache_dir = tmp_path / "cache" / "bmf_flow_viz" / "ast"
+        cache_dir.mkdir(parents=True)
+        if unsafe == "foreign_owner":
+            owner = os.getuid()
+            monkeypatch.setattr(os, "getuid", lambda: owner + 1)
+        else:
+            os.chmod(cache_dir, 0o770 if unsafe == "group_writable" else 0o707)
+        yaml_file = tmp_path / "mapping.yaml"
+        yaml_file.write_text("mapping_rules:\n  - id: m1\n")
+        
+        parse_yaml_files([str(yaml_file)])
+        
+        assert list(cache_dir.iterdir()) == []
+        
+        def fail_parse(self):
+            raise AssertionError("parser should run without a usable cache")
+        monkeypatch.setattr(YAMLParser, "parse", fail_parse)
+        with pytest.raises(AssertionError):
+            parse_yaml_files([str(yaml_file)])
+    
+    def test_parse_yaml_stream(self, tmp_path):
+        """Test parsing a multi-document YAML file."""
+        yaml_file = tmp_path / "filters.yaml"
+        yaml_file.write_text(
+            "filters:\n  - criteria_id: f1\n    criteria:\n      criteria: is_null\n"
+            "---\n"
+            "mapping_rules:\n  - id: m1\n"
+        )
+        
+        analyses = parse_yaml_stream(str(yaml_file))
+        
+        assert [a.file_type for a in analyses] == ['filter', 'mapping']
+        assert analyses[0].filter_criteria[0].criteria_id == 'f1'
+        assert analyses[1].mapping_rules[0].rule_id == 'm1'